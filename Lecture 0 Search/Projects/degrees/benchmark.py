@@ -0,0 +1,88 @@
+"""
+Compares degrees search strategies on random pairs of people.
+
+Usage: python benchmark.py [directory] [--pairs N] [--seed S]
+       python benchmark.py --synthetic PEOPLE [--pairs N] [--seed S]
+"""
+
+import argparse
+import random
+import time
+
+import degrees
+import landmarks
+from graph import build_graph
+
+
+def synthetic_graph(num_people, seed=0):
+    """
+    Builds a random co-star graph where a few prolific people appear
+    in many movies, roughly like the IMDB data.
+    """
+    rng = random.Random(seed)
+    num_movies = max(1, num_people // 3)
+    people = [(str(i), f"Person {i}", str(1900 + i % 100))
+              for i in range(num_people)]
+    movies = [(str(i), f"Movie {i}", str(1950 + i % 70))
+              for i in range(num_movies)]
+    stars = []
+    for movie in range(num_movies):
+        for _ in range(rng.randint(2, 6)):
+            person = int(num_people * rng.random() ** 3)
+            stars.append((str(person), str(movie)))
+    return build_graph(people, movies, stars)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare degrees search strategies on random pairs."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--synthetic", type=int, metavar="PEOPLE",
+                        help="use a random graph instead of a directory")
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("Loading data...")
+    if args.synthetic:
+        degrees.graph = synthetic_graph(args.synthetic, args.seed)
+    else:
+        degrees.load_data(args.directory)
+    people = degrees.graph.person_ids
+    print(f"{len(people)} people, {degrees.graph.num_movies} movies.")
+
+    print("Building landmarks...")
+    degrees.landmark_index = landmarks.build(
+        None if args.synthetic else args.directory, degrees.graph
+    )
+
+    rng = random.Random(args.seed)
+    pairs = [(people[rng.randrange(len(people))],
+              people[rng.randrange(len(people))])
+             for _ in range(args.pairs)]
+
+    lengths = {}
+    print(f"{'search':<16}{'expanded':>12}{'seconds':>12}")
+    for search in degrees.SEARCHES:
+        expanded = 0
+        elapsed = 0
+        lengths[search] = []
+        for source, target in pairs:
+            degrees.path_cache.clear()
+            start = time.perf_counter()
+            path = degrees.shortest_path(source, target, search=search)
+            elapsed += time.perf_counter() - start
+            expanded += degrees.num_explored
+            lengths[search].append(None if path is None else len(path))
+        print(f"{search:<16}{expanded:>12}{elapsed:>12.3f}")
+
+    # Every strategy must agree on the degrees of separation
+    expected = lengths["bfs"]
+    for search, found in lengths.items():
+        if found != expected:
+            raise Exception(f"{search} disagrees with bfs on path lengths")
+
+
+if __name__ == "__main__":
+    main()
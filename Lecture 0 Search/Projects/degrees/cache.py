@@ -0,0 +1,72 @@
+"""
+Bounded least-recently-used cache with size-based eviction.
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache():
+
+    def __init__(self, capacity, size=None):
+        """
+        Creates a cache holding entries whose total size is at most
+        capacity. size maps a value to its size, and defaults to 1 per entry.
+        """
+        self.capacity = capacity
+        self.size = size or (lambda value: 1)
+        self.entries = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """Returns the value for key, marking it as recently used."""
+        try:
+            value = self.entries[key][0]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a value, evicting least recently used entries to make room.
+        Values larger than the whole cache are not stored.
+        """
+        size = self.size(value)
+        if key in self.entries:
+            self.used -= self.entries.pop(key)[1]
+        if size > self.capacity:
+            return
+        self.entries[key] = (value, size)
+        self.used += size
+        while self.used > self.capacity:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.used -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
+
+    def stats(self):
+        """Returns hit, miss and occupancy counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "size": self.used,
+            "capacity": self.capacity
+        }
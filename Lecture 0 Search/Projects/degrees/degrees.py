@@ -1,71 +1,87 @@
-import csv
+import argparse
 import sys
+from array import array
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+import ingest
+import landmarks
+import names
+import snapshot
+from cache import LRUCache
 
-# Maps names to a set of corresponding person_ids
-names = {}
+# Compact graph of people and movies, populated by load_data
+graph = None
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+# Timings of each phase of the last CSV load, see ingest.py
+ingest_stats = []
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Optional landmark distance index, see landmarks.py
+landmark_index = None
+
+# Number of people expanded by the most recent shortest_path call
+num_explored = 0
+
+# Recently answered shortest paths, keyed by (source, target)
+path_cache = LRUCache(capacity=10_000)
+_MISSING = object()
 
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    Load data into memory, from the directory's snapshot if it is
+    up to date and otherwise from its CSV files.
+    """
+    global graph, ingest_stats
+    path_cache.clear()
+    ingest_stats = []
+    graph = snapshot.load(directory)
+    if graph is not None:
+        return
+
+    graph = read_csv(directory)
+    try:
+        snapshot.save(graph, directory)
+    except OSError:
+        pass
+
+
+def load_landmarks(directory, count=16):
+    """
+    Load the landmark index for directory, building it if needed.
+    """
+    global landmark_index
+    landmark_index = landmarks.load(directory, graph)
+    if landmark_index is None or len(landmark_index.person_ids) < count:
+        landmark_index = landmarks.build(directory, graph, count)
+
+
+def read_csv(directory):
+    """
+    Load data from CSV files into a Graph, recording how long each
+    phase took in ingest_stats.
+    """
+    global ingest_stats
+    graph, ingest_stats = ingest.read_directory(directory)
+    return graph
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find degrees of separation between two actors."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=SEARCHES, default="bfs",
+                        help="search strategy (default: bfs)")
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory)
+    if ingest_stats:
+        ingest.report(ingest_stats)
+    if args.search == "alt":
+        load_landmarks(args.directory)
     print("Data loaded.")
-    # print(names)
-    # print("\n\n\n\n\n")
-    # print(people)
-    # print("\n\n\n\n\n")
-    # print(movies)
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -73,7 +89,7 @@ def main():
     target = person_id_for_name(input("Name: "))
     if target is None:
         sys.exit("Person not found.")
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, search=args.search)
 
     if path is None:
         print("Not connected.")
@@ -82,62 +98,272 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
-def goal(node,target):
-    # print(node.state)
-    # print(node.parent)
-    # print(node.action)
-    #TODO
-    if node.state == target:
-        return True
-
-    #raise NotImplementedError
-def expand(node):
-    return neighbors_for_person(node.state)
-    #TODO-- Return a list of nodes
-    #raise NotImplementedError
-def shortest_path(source, target):
+
+def shortest_path(source, target, search="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    search selects the strategy: "bfs" searches outward from the source,
+    "bidirectional" grows the smaller frontier from either end until
+    they meet, and "alt" runs A* guided by the landmark index. The number
+    of people expanded is left in num_explored.
+
+    Answers are memoized in path_cache under the ordered pair of ids, so
+    the reverse of a pair already answered is served from the cache too.
+    """
+    global num_explored
+    num_explored = 0
+
+    key = (source, target) if source <= target else (target, source)
+    path = path_cache.get(key, _MISSING)
+    if path is _MISSING:
+        start = graph.person_index(key[0])
+        goal = graph.person_index(key[1])
+        path = None
+        if start is not None and goal is not None:
+            path = SEARCHES[search](start, goal)
+        if path is not None:
+            path = [(graph.movie_ids[movie], graph.person_ids[person])
+                    for movie, person in path]
+        path_cache.put(key, path)
+
+    if key[0] != source:
+        return _reverse(path, key[0])
+    return _copy(path)
+
+
+def _copy(path):
+    return None if path is None else list(path)
+
+
+def _reverse(path, source):
     """
+    Reverses a path that starts at source, so it leads back to source.
+    """
+    if path is None:
+        return None
+    people = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people[i]) for i in reversed(range(len(path)))]
+
+
+def _bfs(source, target):
+    """
+    Breadth-first search from source, returning (movie, person) index pairs.
+
+    People are marked as reached when they are generated rather than when
+    they are expanded, so each person enters the queue at most once, and
+    the goal is tested at generation time. Parents are kept in flat arrays
+    instead of chains of Nodes.
+    """
+    global num_explored
+    if source == target:
+        return []
+
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    # Parent person and connecting movie of each person, -1 if unreached
+    parents = array("i", [-1]) * graph.num_people
+    via = array("i", parents)
+    parents[source] = source
+    frontier = deque([source])
+
+    while frontier:
+        person = frontier.popleft()
+        num_explored += 1
+
+        # Walk the person's movies and their co-stars straight off the arrays
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbor = movie_stars[j]
+                if parents[neighbor] != -1:
+                    continue
+                parents[neighbor] = person
+                via[neighbor] = movie
+                if neighbor == target:
+                    return _trace(parents, via, target)
+                frontier.append(neighbor)
+
+    return None
+
+
+def _trace(parents, via, person):
+    """
+    Follows parent arrays back from person to the root of the search,
+    returning the (movie, person) index pairs leading from the root.
+    """
+    path = []
+    while parents[person] != person:
+        path.append((via[person], person))
+        person = parents[person]
+    path.reverse()
+    return path
+
+
+def _bidirectional(source, target):
+    """
+    Bidirectional breadth-first search, returning (movie, person) index
+    pairs. Each round expands one whole layer of whichever side has the
+    smaller frontier, and stops as soon as a generated person has already
+    been reached from the other side.
+    """
+    global num_explored
+    if source == target:
+        return []
+
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
 
-    start = Node(state=source,parent= None,action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
-    num_explored=0
-    explored_set = set()
-    while True:
-        if frontier.empty():
-            print("No Solution")
-            exit()
-        currnode = frontier.remove()
-        num_explored+=1
-        explored_set.add(currnode.state)
-        if goal(currnode,target):
-            solution=[]
-            while currnode.parent is not None:
-                solution.append((currnode.action,currnode.state))
-                currnode = currnode.parent
-                solution.reverse()
-            return solution
-        
-        for movie_id,person_id in expand(currnode):
-            if(person_id not in explored_set):
-                child = Node(state=person_id,parent=currnode,action=movie_id)
-                frontier.add(child)
-
-    
-
-
-    # TODO
-    #raise NotImplementedError
+    # Parent person and connecting movie for each side, -1 if unreached
+    unreached = array("i", [-1]) * graph.num_people
+    parents = [array("i", unreached), array("i", unreached)]
+    via = [array("i", unreached), array("i", unreached)]
+    parents[0][source] = source
+    parents[1][target] = target
+    frontiers = [[source], [target]]
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        parent, movie_for, other = parents[side], via[side], parents[1 - side]
+        layer = []
+        for person in frontiers[side]:
+            num_explored += 1
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_stars[j]
+                    if parent[neighbor] != -1:
+                        continue
+                    parent[neighbor] = person
+                    movie_for[neighbor] = movie
+                    if other[neighbor] != -1:
+                        return _join(parents, via, neighbor)
+                    layer.append(neighbor)
+        frontiers[side] = layer
+
+    return None
+
+
+def _join(parents, via, meeting):
+    """
+    Rebuilds the path through the person where both searches met.
+    """
+    forward, backward = parents
+    forward_via, backward_via = via
+
+    path = _trace(forward, forward_via, meeting)
+    person = meeting
+    while backward[person] != person:
+        path.append((backward_via[person], backward[person]))
+        person = backward[person]
+    return path
+
+
+def paths_from(source, targets):
+    """
+    Returns a dict mapping each of targets to its shortest list of
+    (movie_id, person_id) pairs from source, or None if not connected,
+    using a single breadth-first search that stops once every target
+    has been reached.
+    """
+    global num_explored
+    num_explored = 0
+
+    paths = dict.fromkeys(targets)
+    start = graph.person_index(source)
+    if start is None:
+        return paths
+
+    # Index of each known target, and how many are still unreached
+    wanted = {}
+    for target in paths:
+        index = graph.person_index(target)
+        if index is not None:
+            wanted[index] = target
+    remaining = len(wanted)
+    if start in wanted:
+        paths[wanted[start]] = []
+        remaining -= 1
+
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    parents = array("i", [-1]) * graph.num_people
+    via = array("i", parents)
+    parents[start] = start
+    frontier = deque([start])
+
+    while frontier and remaining:
+        person = frontier.popleft()
+        num_explored += 1
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbor = movie_stars[j]
+                if parents[neighbor] != -1:
+                    continue
+                parents[neighbor] = person
+                via[neighbor] = movie
+                frontier.append(neighbor)
+                if neighbor in wanted:
+                    paths[wanted[neighbor]] = [
+                        (graph.movie_ids[movie], graph.person_ids[person])
+                        for movie, person in _trace(parents, via, neighbor)
+                    ]
+                    remaining -= 1
+
+    return paths
+
+
+def _alt(source, target):
+    """
+    A* search using landmark distance bounds as its heuristic.
+    """
+    global num_explored
+    if landmark_index is None:
+        raise Exception("no landmark index loaded")
+    path = landmark_index.search(graph, source, target)
+    num_explored += landmark_index.num_explored
+    return path
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between two
+    IMDB person ids from the landmark index, without searching. lower is
+    infinite if they are not connected and upper is None if unknown, so
+    an id that is not in the graph gives (inf, None).
+    """
+    if landmark_index is None:
+        raise Exception("no landmark index loaded")
+    source = graph.person_index(source)
+    target = graph.person_index(target)
+    if source is None or target is None:
+        return float("inf"), None
+    return landmark_index.bounds(source, target)
+
+
+# Search strategies selectable by shortest_path and the command line
+SEARCHES = {
+    "bfs": _bfs,
+    "bidirectional": _bidirectional,
+    "alt": _alt
+}
 
 
 def person_id_for_name(name):
@@ -145,15 +371,20 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = [graph.person_ids[person] for person in graph.people_named(name)]
     if len(person_ids) == 0:
+        suggestions = candidates_for_name(name, limit=5)
+        if suggestions:
+            print("Did you mean:")
+            for candidate in suggestions:
+                print(f"  {candidate['name']} ({candidate['birth']})")
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            person = graph.person_index(person_id)
+            name = graph.person_names[person]
+            birth = graph.person_births[person]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -166,17 +397,59 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, limit=10, similar=False):
+    """
+    Returns up to limit people matching a name, best match first, without
+    prompting. Each candidate is a dict with the person's id, name, birth
+    and a score in [0, 1]; exact matches score 1, then prefix matches, then
+    approximate matches by shared trigrams, so typos still find the person.
+    Approximate matches are left out once a name matches exactly, unless
+    similar is true.
+    """
+    candidates = []
+    for person, score in names.search(graph, name, limit, similar):
+        candidates.append({
+            "id": graph.person_ids[person],
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "score": score
+        })
+    return candidates
+
+
+def person_name(person_id):
+    """
+    Returns the name of the person with a given IMDB id.
+    """
+    return graph.person_names[graph.person_index(person_id)]
+
+
+def movie_title(movie_id):
+    """
+    Returns the title of the movie with a given IMDB id.
+    """
+    return graph.movie_titles[graph.movie_index(movie_id)]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    person = graph.person_index(person_id)
+    return {
+        (graph.movie_ids[movie], graph.person_ids[neighbor])
+        for movie, neighbor in graph.neighbors(person)
+    }
+
+
+def cache_stats():
+    """
+    Returns hit and miss counters for the path cache.
+    """
+    return {
+        "paths": path_cache.stats()
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+Microbenchmark for the frontiers in util.py.
+
+Fills each frontier with N nodes, checks membership of every state and
+drains it again, at N from 10^3 to 10^6. The original list-based
+frontiers, which copy the list on every remove, are timed alongside for
+comparison up to --list-limit nodes since they scale quadratically.
+
+Usage: python frontier_benchmark.py [--max-exponent E] [--list-limit N]
+"""
+
+import argparse
+import time
+
+from util import Node, StackFrontier, QueueFrontier
+
+
+class ListStackFrontier():
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def run(frontier_class, n, check_membership):
+    """Returns seconds taken to fill and drain a frontier of n nodes."""
+    nodes = [Node(state=i, parent=None, action=None) for i in range(n)]
+    start = time.perf_counter()
+    frontier = frontier_class()
+    for node in nodes:
+        frontier.add(node)
+    if check_membership:
+        for i in range(0, n, max(1, n // 1000)):
+            frontier.contains_state(i)
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark frontiers.")
+    parser.add_argument("--max-exponent", type=int, default=6)
+    parser.add_argument("--list-limit", type=int, default=10 ** 5)
+    args = parser.parse_args()
+
+    frontiers = [
+        ("stack", StackFrontier, ListStackFrontier),
+        ("queue", QueueFrontier, ListQueueFrontier)
+    ]
+    print(f"{'frontier':<10}{'nodes':>10}{'deque (s)':>14}{'list (s)':>14}")
+    for exponent in range(3, args.max_exponent + 1):
+        n = 10 ** exponent
+        for name, fast, slow in frontiers:
+            fast_time = f"{run(fast, n, True):.4f}"
+            slow_time = (f"{run(slow, n, True):.4f}"
+                         if n <= args.list_limit else "-")
+            print(f"{name:<10}{n:>10}{fast_time:>14}{slow_time:>14}")
+
+
+if __name__ == "__main__":
+    main()
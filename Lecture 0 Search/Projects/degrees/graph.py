@@ -0,0 +1,209 @@
+"""
+Compact integer-indexed graph of people and the movies they starred in.
+
+People and movies are interned to dense integer indices (sorted by their
+IMDB id), and the bipartite star relation is stored twice in CSR form:
+
+    person_offsets[p] .. person_offsets[p + 1]   -> slice of person_movies
+    movie_offsets[m]  .. movie_offsets[m + 1]    -> slice of movie_stars
+"""
+
+import bisect
+from array import array
+from itertools import repeat
+
+from names import build_trigrams
+
+
+class Graph():
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_stars, name_order, reverse_order=None,
+                 trigram_keys=None, trigram_offsets=None, trigram_people=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Person indices sorted by lowercased name, for name lookups, and
+        # by lowercased name read backwards, built on first use if not given
+        self.name_order = name_order
+        self._reverse_order = reverse_order
+
+        # Posting lists of person indices per name trigram, see names.py,
+        # built on first use if not given
+        self._trigrams = None
+        if trigram_keys is not None:
+            self._trigrams = (trigram_keys, trigram_offsets, trigram_people)
+
+    @property
+    def num_people(self):
+        return len(self.person_ids)
+
+    @property
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def person_index(self, person_id):
+        """Returns the integer index of an IMDB person id, or None."""
+        return _find(self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """Returns the integer index of an IMDB movie id, or None."""
+        return _find(self.movie_ids, movie_id)
+
+    def people_named(self, name):
+        """Returns indices of all people whose name matches, ignoring case."""
+        name = name.lower()
+        key = self.lower_name
+        lo = bisect.bisect_left(self.name_order, name, key=key)
+        hi = bisect.bisect_right(self.name_order, name, lo=lo, key=key)
+        return [self.name_order[i] for i in range(lo, hi)]
+
+    @property
+    def reverse_order(self):
+        if self._reverse_order is None:
+            backwards = [name.lower()[::-1] for name in self.person_names]
+            self._reverse_order = array("i", sorted(
+                range(self.num_people), key=backwards.__getitem__
+            ))
+        return self._reverse_order
+
+    def trigrams(self):
+        """
+        Returns the (keys, offsets, people) name trigram index, building
+        it the first time it is needed.
+        """
+        if self._trigrams is None:
+            self._trigrams = build_trigrams(self.person_names)
+        return self._trigrams
+
+    @property
+    def trigram_keys(self):
+        return self.trigrams()[0]
+
+    @property
+    def trigram_offsets(self):
+        return self.trigrams()[1]
+
+    @property
+    def trigram_people(self):
+        return self.trigrams()[2]
+
+    def lower_name(self, person):
+        """Returns a person's name in lowercase."""
+        return self.person_names[person].lower()
+
+    def reversed_name(self, person):
+        """Returns a person's name in lowercase, read backwards."""
+        return self.person_names[person].lower()[::-1]
+
+    def degree(self, person):
+        """Returns the number of movies a person starred in."""
+        return self.person_offsets[person + 1] - self.person_offsets[person]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for everyone who starred
+        with a given person, including the person themself.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+
+def _find(keys, key):
+    """Binary searches a sorted sequence, returning the index of key or None."""
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        return i
+    return None
+
+
+def build_graph(people, movies, stars, trigrams=None):
+    """
+    Builds a Graph from iterables of (id, name, birth) people rows,
+    (id, title, year) movie rows and (person_id, movie_id) star rows.
+
+    Star rows that refer to unknown people or movies are ignored,
+    as are duplicates. trigrams may hold a name index already built by
+    build_trigrams for the people sorted by id; otherwise it is built the
+    first time a lookup needs it.
+    """
+    people = sorted(people)
+    movies = sorted(movies)
+    person_ids = [row[0] for row in people]
+    movie_ids = [row[0] for row in movies]
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    num_people = len(person_ids)
+    num_movies = len(movie_ids)
+
+    # Encode each edge as a single integer so it can be deduplicated and
+    # sorted cheaply, first by person and then by movie
+    edges = set()
+    for person_id, movie_id in stars:
+        person = person_index.get(person_id)
+        movie = movie_index.get(movie_id)
+        if person is not None and movie is not None:
+            edges.add(person * num_movies + movie)
+    by_person = sorted(edges)
+    by_movie = sorted((edge % num_movies) * num_people + edge // num_movies
+                      for edge in edges)
+    del edges
+
+    person_offsets, person_movies = _csr(by_person, num_people, num_movies)
+    movie_offsets, movie_stars = _csr(by_movie, num_movies, num_people)
+
+    # Sorting is stable, so people with the same name stay in index order
+    person_names = [row[1] for row in people]
+    lowered = [name.lower() for name in person_names]
+    name_order = array("i", sorted(range(num_people), key=lowered.__getitem__))
+    del lowered
+    if trigrams is None:
+        trigrams = (None, None, None)
+    trigram_keys, trigram_offsets, trigram_people = trigrams
+
+    return Graph(
+        person_ids=person_ids,
+        person_names=person_names,
+        person_births=[row[2] for row in people],
+        movie_ids=movie_ids,
+        movie_titles=[row[1] for row in movies],
+        movie_years=[row[2] for row in movies],
+        person_offsets=person_offsets,
+        person_movies=person_movies,
+        movie_offsets=movie_offsets,
+        movie_stars=movie_stars,
+        name_order=name_order,
+        trigram_keys=trigram_keys,
+        trigram_offsets=trigram_offsets,
+        trigram_people=trigram_people
+    )
+
+
+def _csr(edges, num_rows, num_cols):
+    """
+    Converts sorted edges encoded as row * num_cols + col
+    into offset and column arrays.
+    """
+    # Edges are sorted by row, so each row starts where a binary search
+    # for it lands
+    rows = [edge // num_cols for edge in edges]
+    offsets = array("q", map(bisect.bisect_left, repeat(rows),
+                             range(num_rows + 1)))
+    cols = array("i", [edge % num_cols for edge in edges])
+    return offsets, cols
@@ -0,0 +1,152 @@
+"""
+Streaming, parallel ingestion of a degrees data directory.
+
+people.csv and movies.csv are parsed at the same time with a plain
+csv.reader, since names and titles may be quoted: movies in a worker
+process and people, the larger file, in this one, so only the movie rows
+are pickled between processes. The trigram name index is left for the
+graph to build when a lookup first needs it.
+stars.csv holds only ids, so it is read in large chunks and split by hand,
+and its rows are streamed straight into build_graph instead of being
+collected first.
+
+Each phase is timed, and its rows per second and the peak resident
+memory seen so far (the largest of this process and its workers) are
+recorded in the stats returned with the graph.
+"""
+
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from graph import build_graph
+
+# Characters of stars.csv read per chunk
+CHUNK_SIZE = 1 << 22
+
+
+def read_directory(directory, workers=None):
+    """
+    Returns (graph, stats) for the CSV files in directory, where stats is
+    a list of dicts with each phase's name, rows, seconds, rows_per_second
+    and peak_memory_kb. movies.csv is parsed in a worker process if
+    workers is more than 1, which it is by default on more than one CPU.
+    """
+    if workers is None:
+        workers = min(2, os.cpu_count() or 1)
+    stats = []
+
+    start = time.perf_counter()
+    people_path = f"{directory}/people.csv"
+    movies_path = f"{directory}/movies.csv"
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            movies = pool.submit(read_table, movies_path,
+                                 ["id", "title", "year"])
+            people = read_table(people_path, ["id", "name", "birth"])
+            movies = movies.result()
+    else:
+        people = read_table(people_path, ["id", "name", "birth"])
+        movies = read_table(movies_path, ["id", "title", "year"])
+    stats.append(_phase("people+movies", len(people) + len(movies), start))
+
+    # build_graph drains the stars stream before it starts sorting edges
+    start = time.perf_counter()
+    stars = StarStream(f"{directory}/stars.csv")
+    graph = build_graph(people, movies, stars)
+    stats.append(_phase("stars", stars.rows, start, stars.finished))
+    stats.append(_phase("build", graph.num_people, stars.finished))
+    return graph, stats
+
+
+def read_table(path, columns):
+    """
+    Returns a list of tuples holding the given columns of each CSV row.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indices = [header.index(column) for column in columns]
+        width = max(indices) + 1
+        return [tuple(row[i] for i in indices)
+                for row in reader if len(row) >= width]
+
+
+class StarStream():
+    """
+    Iterable of (person_id, movie_id) rows of a stars CSV, read in chunks.
+    Counts rows, and records when the file has been fully read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.finished = None
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8", newline="") as f:
+            header = f.readline().rstrip("\r\n").split(",")
+            person, movie = header.index("person_id"), header.index("movie_id")
+            width = max(person, movie) + 1
+            rest = ""
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                lines = (rest + chunk).split("\n")
+                rest = lines.pop() if chunk else ""
+                for line in lines:
+                    if '"' in line:
+                        fields = next(csv.reader([line]))
+                    else:
+                        fields = line.rstrip("\r").split(",")
+                    if len(fields) >= width:
+                        self.rows += 1
+                        yield fields[person], fields[movie]
+                if not chunk:
+                    break
+        self.finished = time.perf_counter()
+
+
+def _phase(name, rows, start, end=None):
+    seconds = (end or time.perf_counter()) - start
+    return {
+        "phase": name,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else float("inf"),
+        "peak_memory_kb": peak_memory_kb()
+    }
+
+
+def peak_memory_kb():
+    """
+    Returns the peak resident memory of this process or any of its
+    finished workers, in kilobytes, or None where it is unavailable.
+    """
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    # macOS reports bytes rather than kilobytes
+    if sys.platform == "darwin":
+        return peak // 1024
+    return peak
+
+
+def report(stats):
+    """Prints a table of ingestion phases."""
+    print(f"{'phase':<16}{'rows':>10}{'seconds':>10}"
+          f"{'rows/s':>12}{'peak MB':>10}")
+    for phase in stats:
+        peak = phase["peak_memory_kb"]
+        peak = "-" if peak is None else f"{peak / 1024:.1f}"
+        print(f"{phase['phase']:<16}{phase['rows']:>10}"
+              f"{phase['seconds']:>10.3f}"
+              f"{phase['rows_per_second']:>12.0f}{peak:>10}")
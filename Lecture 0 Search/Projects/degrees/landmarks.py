@@ -0,0 +1,286 @@
+"""
+Landmark distance oracle for degrees.
+
+A landmark index holds, for a handful of high-degree people, the BFS
+distance from that person to everyone else. By the triangle inequality
+those distances give instant bounds on the degrees of separation between
+any two people, and a heuristic for A* search (ALT).
+
+The index is stored next to the data as degrees.landmarks. Building it is
+incremental, since distances for landmarks already on disk are kept, and
+new landmarks are searched in parallel worker processes.
+
+Usage: python landmarks.py [directory] [--count N] [--workers N]
+"""
+
+import argparse
+import heapq
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+from array import array
+from collections import deque
+
+import snapshot
+
+MAGIC = b"DEGLMRK\0"
+VERSION = 1
+FILENAME = "degrees.landmarks"
+PREAMBLE = struct.Struct("<8sII")
+
+# Distance recorded for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class Landmarks():
+
+    def __init__(self, person_ids, distances):
+        # IMDB ids of the landmarks and, for each, a byte per person
+        self.person_ids = person_ids
+        self.distances = distances
+        self.num_explored = 0
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between two person
+        indices. lower is infinite if they are provably not connected and
+        upper is None if no landmark reaches both.
+        """
+        lower = 0
+        upper = None
+        for row in self.distances:
+            a, b = row[source], row[target]
+            if a == UNREACHABLE and b == UNREACHABLE:
+                continue
+            if a == UNREACHABLE or b == UNREACHABLE:
+                return float("inf"), None
+            lower = max(lower, abs(a - b))
+            upper = a + b if upper is None else min(upper, a + b)
+        return lower, upper
+
+    def search(self, graph, source, target):
+        """
+        A* search between person indices guided by landmark lower bounds,
+        returning (movie, person) index pairs or None if not connected.
+        The number of people expanded is left in num_explored.
+        """
+        self.num_explored = 0
+        if source == target:
+            return []
+
+        # Only landmarks that reach the target say anything about it
+        rows = []
+        for row in self.distances:
+            if row[target] != UNREACHABLE:
+                rows.append((row, row[target]))
+            elif row[source] != UNREACHABLE:
+                return None
+
+        def heuristic(person):
+            h = 0
+            for row, to_target in rows:
+                d = row[person]
+                if d == UNREACHABLE:
+                    return None
+                if d - to_target > h:
+                    h = d - to_target
+                elif to_target - d > h:
+                    h = to_target - d
+            return h
+
+        parents = array("i", [-1]) * graph.num_people
+        via = array("i", parents)
+        cost = array("i", parents)
+        closed = bytearray(graph.num_people)
+        parents[source] = source
+        cost[source] = 0
+        frontier = [(heuristic(source), 0, source)]
+
+        while frontier:
+            _, g, person = heapq.heappop(frontier)
+            if closed[person]:
+                continue
+            if person == target:
+                path = []
+                while parents[person] != person:
+                    path.append((via[person], person))
+                    person = parents[person]
+                path.reverse()
+                return path
+            closed[person] = 1
+            self.num_explored += 1
+
+            g += 1
+            for movie, neighbor in graph.neighbors(person):
+                if closed[neighbor] or cost[neighbor] != -1 and cost[neighbor] <= g:
+                    continue
+                h = heuristic(neighbor)
+                if h is None:
+                    continue
+                cost[neighbor] = g
+                parents[neighbor] = person
+                via[neighbor] = movie
+                heapq.heappush(frontier, (g + h, g, neighbor))
+
+        return None
+
+
+def distances_from(graph, source):
+    """
+    Returns a byte array of BFS distances from a person index to everyone,
+    saturating at UNREACHABLE.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    distances = array("B", [UNREACHABLE]) * graph.num_people
+    distances[source] = 0
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        d = min(distances[person] + 1, UNREACHABLE - 1)
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbor = movie_stars[j]
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = d
+                    frontier.append(neighbor)
+    return distances
+
+
+def choose(graph, count):
+    """
+    Returns the indices of the count people who starred in the most movies.
+    """
+    return heapq.nlargest(count, range(graph.num_people), key=graph.degree)
+
+
+def path_for(directory):
+    """Returns the landmark index path for a data directory."""
+    return os.path.join(directory, FILENAME)
+
+
+def load(directory, graph, path=None):
+    """
+    Memory-maps the landmark index for directory. Returns None if there is
+    none, or if it is stale or was built for a different graph.
+    """
+    path = path or path_for(directory)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = PREAMBLE.unpack_from(buffer)
+        start = PREAMBLE.size
+        header = json.loads(bytes(buffer[start:start + length]))
+    except (OSError, ValueError, struct.error):
+        return None
+    if magic != MAGIC or version != VERSION:
+        return None
+    if header["num_people"] != graph.num_people:
+        return None
+    if not snapshot.is_fresh(header["sources"], directory):
+        return None
+
+    view = memoryview(buffer)
+    base = PREAMBLE.size + length
+    n = graph.num_people
+    distances = [view[base + i * n:base + (i + 1) * n]
+                 for i in range(len(header["landmarks"]))]
+    return Landmarks(header["landmarks"], distances)
+
+
+def save(landmarks, directory, path=None):
+    """Writes a landmark index atomically."""
+    path = path or path_for(directory)
+    header = json.dumps({
+        "sources": snapshot.source_info(directory),
+        "num_people": len(landmarks.distances[0]) if landmarks.distances else 0,
+        "landmarks": landmarks.person_ids
+    }).encode("utf-8")
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for row in landmarks.distances:
+            f.write(row)
+    os.replace(temporary, path)
+
+
+def build(directory, graph, count=16, workers=None):
+    """
+    Returns a landmark index of the count highest-degree people, reusing
+    distances already stored for directory and searching from the rest
+    in parallel. The updated index is written back to disk, unless
+    directory is None.
+    """
+    existing = load(directory, graph) if directory is not None else None
+    known = {}
+    if existing is not None:
+        known = dict(zip(existing.person_ids, existing.distances))
+
+    chosen = [graph.person_ids[person] for person in choose(graph, count)]
+    missing = [person_id for person_id in chosen if person_id not in known]
+    if missing:
+        global _graph
+        _graph = graph
+        indices = [graph.person_index(person_id) for person_id in missing]
+        with multiprocessing.Pool(workers, initializer=_initialize,
+                                  initargs=(directory,)) as pool:
+            for person_id, row in zip(missing, pool.map(_distances, indices)):
+                known[person_id] = row
+
+    landmarks = Landmarks(chosen, [known[person_id] for person_id in chosen])
+    if directory is not None and (
+        existing is None or existing.person_ids != chosen
+    ):
+        save(landmarks, directory)
+    return landmarks
+
+
+# Graph used by worker processes, inherited on fork or loaded on start
+_graph = None
+
+
+def _initialize(directory):
+    global _graph
+    if _graph is None:
+        import degrees
+        degrees.load_data(directory)
+        _graph = degrees.graph
+
+
+def _distances(person):
+    return distances_from(_graph, person)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the landmark distance index for a data directory."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks (default: 16)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    import degrees
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Building landmarks...")
+    landmarks = build(args.directory, degrees.graph, args.count, args.workers)
+    names = ", ".join(degrees.person_name(person_id)
+                      for person_id in landmarks.person_ids)
+    print(f"Landmarks: {names}")
+    print(f"Index written to {path_for(args.directory)}.")
+
+
+if __name__ == "__main__":
+    main()
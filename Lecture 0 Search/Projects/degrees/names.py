@@ -0,0 +1,185 @@
+"""
+Name index for resolving people by exact, prefix or approximate name.
+
+Every lowercased name is split into overlapping trigrams (padded so the
+start and end of the name count too) and a posting list of person indices
+is kept for each trigram, in the same CSR layout as the star relation:
+
+    trigram_offsets[t] .. trigram_offsets[t + 1]   -> slice of trigram_people
+
+where t is the position of the trigram in the sorted trigram_keys.
+
+Approximate lookups do not scan whole posting lists. A name with a typo
+still shares a long start or a long end with the name meant, so the
+people either side of the query in name order and in reversed name order
+are rescored, with the best hits in the query's rarest posting lists.
+"""
+
+import bisect
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from itertools import chain, islice, repeat
+from operator import eq
+
+# Fuzzy lookups rescore the NEIGHBORS people on either side of the query
+# in both name orders, and the RESCORE people with the most hits in the
+# query's rarest posting lists, counted rarest first until the next list
+# would take them past POSTINGS entries
+NEIGHBORS = 16
+POSTINGS = 2000
+RESCORE = 16
+
+
+def trigrams(name):
+    """Returns the set of trigrams of a name, ignoring case."""
+    padded = f"  {name.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_trigrams(person_names):
+    """
+    Returns (keys, offsets, people) arrays indexing every person by the
+    trigrams of their name.
+
+    A trigram either starts the name, spans a space or lies within one
+    word padded by spaces, so the trigrams of each distinct word are only
+    found once and cover everyone with that word in their name.
+    """
+    # People by the first word of their name, by any later word, and by
+    # each trigram spanning a space
+    by_first = defaultdict(list)
+    by_word = defaultdict(list)
+    postings = defaultdict(list)
+    lowered = map(str.lower, person_names)
+    for person, words in enumerate(map(str.split, lowered, repeat(" "))):
+        by_first[words[0]].append(person)
+        if len(words) == 2:
+            first, last = words
+            by_word[last].append(person)
+            postings[f"{first[-1:] or ' '} {last[:1] or ' '}"].append(person)
+        elif len(words) > 2:
+            for word in set(words[1:]):
+                by_word[word].append(person)
+            for trigram in {f"{a[-1:] or ' '} {b[:1] or ' '}"
+                            for a, b in zip(words, words[1:])}:
+                postings[trigram].append(person)
+
+    # Lists of people for each trigram, one per word it lies in
+    lists = defaultdict(list)
+    for table, leading in ((by_first, True), (by_word, False)):
+        for word, people in table.items():
+            padded = f" {word} "
+            found = {padded[i:i + 3] for i in range(len(word))}
+            if leading:
+                found.add("  " + (word[:1] or " "))
+            for trigram in found:
+                lists[trigram].append(people)
+    for trigram, people in postings.items():
+        lists[trigram].append(people)
+
+    # Merge each trigram's lists in person order, dropping people with the
+    # trigram in more than one word
+    keys = sorted(lists)
+    offsets = array("q", [0])
+    people = array("i")
+    for key in keys:
+        found = lists.pop(key)
+        if len(found) == 1:
+            people.extend(found[0])
+        else:
+            merged = sorted(chain.from_iterable(found))
+            if any(map(eq, merged, islice(merged, 1, None))):
+                merged = dict.fromkeys(merged)
+            people.extend(merged)
+        offsets.append(len(people))
+    return keys, offsets, people
+
+
+def search(graph, query, limit=10, similar=False):
+    """
+    Returns up to limit (person, score) pairs for the people whose names
+    best match query, best first. Exact matches score 1, then names that
+    start with query, then names sharing the most trigrams with it. Once
+    a name matches exactly, similar names are only looked for if similar
+    is true.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    lowered = query.lower()
+    scores = {}
+
+    # Exact and prefix matches come straight off the sorted name order
+    key = graph.lower_name
+    order = graph.name_order
+    lo = bisect.bisect_left(order, lowered, key=key)
+    exact = False
+    for i in range(lo, len(order)):
+        person = order[i]
+        name = key(person)
+        if not name.startswith(lowered) or len(scores) >= limit:
+            break
+        if name == lowered:
+            scores[person] = 1.0
+            exact = True
+        else:
+            scores[person] = 0.9 + 0.1 * len(lowered) / len(name)
+
+    if len(scores) < limit and (similar or not exact):
+        for person, score in _fuzzy(graph, query):
+            if person not in scores:
+                scores[person] = min(score, 0.9)
+
+    return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+def _fuzzy(graph, query):
+    """
+    Yields (person, score) for people whose names sort next to query or
+    share its rarest trigrams, scored by the Dice coefficient of their
+    trigram sets.
+    """
+    lowered = query.lower()
+    candidates = set(_near(graph.name_order, graph.lower_name, lowered))
+    candidates.update(_near(graph.reverse_order, graph.reversed_name,
+                            lowered[::-1]))
+
+    wanted = trigrams(query)
+    keys, offsets, people = graph.trigrams()
+    postings = []
+    for trigram in wanted:
+        t = _find(keys, trigram)
+        if t is not None:
+            postings.append((offsets[t + 1] - offsets[t], offsets[t]))
+    postings.sort()
+    counts = Counter()
+    budget = POSTINGS
+    for size, start in postings:
+        if size > budget:
+            break
+        counts.update(people[start:start + size])
+        budget -= size
+    candidates.update(person for person, _ in counts.most_common(RESCORE))
+
+    for person in candidates:
+        found = trigrams(graph.person_names[person])
+        shared = len(wanted & found)
+        if shared:
+            yield person, 2 * shared / (len(wanted) + len(found))
+
+
+def _near(order, key, text):
+    """
+    Returns the NEIGHBORS people on either side of where text would sort
+    in order, by key.
+    """
+    i = bisect.bisect_left(order, text, key=key)
+    return order[max(i - NEIGHBORS, 0):i + NEIGHBORS]
+
+
+def _find(keys, key):
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        return i
+    return None
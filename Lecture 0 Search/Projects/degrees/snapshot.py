@@ -0,0 +1,228 @@
+"""
+Versioned binary snapshots of a degrees Graph.
+
+A snapshot is compiled once from the CSV files of a data directory and
+memory-mapped on later runs, so loading is close to instant and every
+process reading the same snapshot shares its pages. The snapshot records
+the size, mtime and hash of each CSV and is ignored once they change.
+
+Layout: an 8-byte magic, a little-endian uint32 version and uint32 header
+length, a JSON header describing the sources and sections, then each
+section's raw array data aligned to 8 bytes.
+
+Usage: python snapshot.py [directory]
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 3
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+PREAMBLE = struct.Struct("<8sII")
+
+# Graph attributes stored as string tables and as integer arrays
+STRINGS = ["person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years", "trigram_keys"]
+ARRAYS = ["person_offsets", "person_movies",
+          "movie_offsets", "movie_stars", "name_order", "reverse_order",
+          "trigram_offsets", "trigram_people"]
+
+
+class StringTable():
+    """
+    Read-only sequence of strings backed by an offsets array
+    and a UTF-8 blob, decoded on access.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def path_for(directory):
+    """Returns the snapshot path for a data directory."""
+    return os.path.join(directory, FILENAME)
+
+
+def source_info(directory, with_hash=True):
+    """Returns size, mtime and (optionally) hash of each source CSV."""
+    info = {}
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        info[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": _hash_file(path) if with_hash else None
+        }
+    return info
+
+
+def _hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_fresh(recorded, directory):
+    """
+    Checks whether recorded source info still matches the CSV files.
+
+    Matching size and mtime is trusted; otherwise the files are rehashed,
+    so touching a file without changing it does not force a rebuild.
+    """
+    try:
+        current = source_info(directory, with_hash=False)
+    except OSError:
+        return False
+    if set(current) != set(recorded):
+        return False
+    for name, info in current.items():
+        old = recorded[name]
+        if info["size"] != old["size"]:
+            return False
+        if (info["mtime_ns"] != old["mtime_ns"]
+                and _hash_file(os.path.join(directory, name)) != old["sha1"]):
+            return False
+    return True
+
+
+def save(graph, directory, path=None):
+    """
+    Writes a snapshot of graph for the CSV files in directory.
+    The file is written atomically next to its final location.
+    """
+    path = path or path_for(directory)
+    sections = []
+    for name in STRINGS:
+        offsets, data = _encode_strings(getattr(graph, name))
+        sections.append((name + ".offsets", offsets))
+        sections.append((name + ".data", data))
+    for name in ARRAYS:
+        values = getattr(graph, name)
+        typecode = getattr(values, "typecode", None) or values.format
+        sections.append((name, array(typecode, values)))
+
+    header = {
+        "byteorder": sys.byteorder,
+        "sources": source_info(directory),
+        "sections": {}
+    }
+
+    # Lay out sections after a header of known size
+    position = 0
+    for name, values in sections:
+        header["sections"][name] = [values.typecode, position, len(values)]
+        position = _align(position + len(values) * values.itemsize)
+    encoded = json.dumps(header).encode("utf-8")
+    base = _align(PREAMBLE.size + len(encoded))
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for name, values in sections:
+            f.seek(base + header["sections"][name][1])
+            values.tofile(f)
+        f.truncate(base + position)
+    os.replace(temporary, path)
+
+
+def load(directory, path=None):
+    """
+    Memory-maps the snapshot for directory and returns a Graph over it.
+    Returns None if there is no snapshot or it is stale or incompatible.
+    """
+    path = path or path_for(directory)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, length = PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            return None
+        start = PREAMBLE.size
+        header = json.loads(bytes(buffer[start:start + length]))
+    except (struct.error, ValueError):
+        return None
+    if header["byteorder"] != sys.byteorder:
+        return None
+    if not is_fresh(header["sources"], directory):
+        return None
+
+    view = memoryview(buffer)
+    base = _align(PREAMBLE.size + length)
+
+    def section(name):
+        typecode, offset, count = header["sections"][name]
+        itemsize = array(typecode).itemsize
+        start = base + offset
+        return view[start:start + count * itemsize].cast(typecode)
+
+    values = {}
+    for name in STRINGS:
+        values[name] = StringTable(section(name + ".offsets"),
+                                   section(name + ".data"))
+    for name in ARRAYS:
+        values[name] = section(name)
+    return Graph(**values)
+
+
+def _encode_strings(strings):
+    offsets = array("q", [0])
+    data = array("B")
+    for s in strings:
+        data.frombytes(s.encode("utf-8"))
+        offsets.append(len(data))
+    return offsets, data
+
+
+def _align(n, alignment=8):
+    return (n + alignment - 1) // alignment * alignment
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    from ingest import read_directory, report
+
+    print("Loading data...")
+    graph, stats = read_directory(directory)
+    report(stats)
+    print("Writing snapshot...")
+    save(graph, directory)
+    print(f"Snapshot written to {path_for(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
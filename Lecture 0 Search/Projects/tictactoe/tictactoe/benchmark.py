@@ -0,0 +1,66 @@
+"""
+Times enumeration of the full Tic Tac Toe game tree with the list of lists
+engine in tictactoe.py and the bitboard engine in bitboard.py.
+
+Both must count 255168 games and 549946 positions.
+
+Usage: python benchmark.py [--repeat N]
+"""
+
+import argparse
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def count_list_games(board):
+    """
+    Returns (games, positions) for the game tree below a list of lists
+    board, using only the public functions of tictactoe.py.
+    """
+    if ttt.terminal(board):
+        return 1, 1
+    games = 0
+    positions = 1
+    for action in ttt.actions(board):
+        g, p = count_list_games(ttt.result(board, action))
+        games += g
+        positions += p
+    return games, positions
+
+
+def measure(name, count, start, repeat):
+    """Runs count(start) repeat times and prints the fastest run."""
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        games, positions = count(start)
+        elapsed = time.perf_counter() - begin
+        best = elapsed if best is None else min(best, elapsed)
+    if (games, positions) != (255168, 549946):
+        raise Exception(f"{name} counted {games} games, {positions} positions")
+    print(f"{name:<12}{games:>10}{positions:>12}{best:>10.3f}"
+          f"{positions / best:>14.0f}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time full game tree enumeration for both engines."
+    )
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per engine, fastest is kept (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'engine':<12}{'games':>10}{'positions':>12}{'seconds':>10}"
+          f"{'positions/s':>14}")
+    before = measure("lists", count_list_games, ttt.initial_state(),
+                     args.repeat)
+    after = measure("bitboard", lambda start: bitboard.count_games(*start),
+                    (0, 0), args.repeat)
+    print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Bitboard Tic Tac Toe engine.
+
+A position is a pair of 9-bit masks (x, o), one per player, where bit
+3 * i + j is set if that player holds cell (i, j). Moves are a single OR
+on an int, so nothing is copied, and a line is found with one lookup in a
+table of all 512 masks, precomputed from the 8 winning lines.
+
+from_board and to_board convert to and from the list of lists boards of
+tictactoe.py, and the list functions at the bottom of this module wrap
+the engine with the same API, so runner.py can use either module.
+"""
+
+from tictactoe import X, O, EMPTY
+
+FULL = (1 << 9) - 1
+
+# Rows, columns and diagonals as masks of cells
+WIN_MASKS = tuple(
+    sum(1 << (3 * i + j) for i, j in line)
+    for line in (
+        [[(i, j) for j in range(3)] for i in range(3)]
+        + [[(i, j) for i in range(3)] for j in range(3)]
+        + [[(i, i) for i in range(3)], [(i, 2 - i) for i in range(3)]]
+    )
+)
+
+# WINS[mask] is 1 if mask covers a winning line, COUNTS[mask] its bits
+WINS = bytes(
+    any(mask & line == line for line in WIN_MASKS) for mask in range(1 << 9)
+)
+COUNTS = bytes(bin(mask).count("1") for mask in range(1 << 9))
+
+# Cells of each mask of empty squares, in index order
+CELLS = tuple(
+    tuple(cell for cell in range(9) if mask >> cell & 1)
+    for mask in range(1 << 9)
+)
+
+
+def from_board(board):
+    """Returns the (x, o) masks of a list of lists board."""
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """Returns the list of lists board of (x, o) masks."""
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def x_to_move(x, o):
+    """Returns True if X has the next turn."""
+    return COUNTS[x] == COUNTS[o]
+
+
+def moves(x, o):
+    """Returns the empty cells, as indices 3 * i + j."""
+    return CELLS[FULL & ~(x | o)]
+
+
+def play(x, o, cell):
+    """Returns the (x, o) masks after the player to move takes cell."""
+    bit = 1 << cell
+    if (x | o) & bit:
+        raise Exception("not a valid move")
+    if COUNTS[x] == COUNTS[o]:
+        return x | bit, o
+    return x, o | bit
+
+
+def outcome(x, o):
+    """
+    Returns 1 if X has won, -1 if O has won, 0 for a tie, or None if the
+    game is not over.
+    """
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    if x | o == FULL:
+        return 0
+    return None
+
+
+def value(x, o):
+    """Returns the minimax value of a position for X."""
+    score = outcome(x, o)
+    if score is not None:
+        return score
+    if COUNTS[x] == COUNTS[o]:
+        return max(value(x | 1 << cell, o) for cell in moves(x, o))
+    return min(value(x, o | 1 << cell) for cell in moves(x, o))
+
+
+def count_games(x=0, o=0):
+    """
+    Returns (games, positions) for the full game tree below a position:
+    the number of distinct move sequences to the end of the game, and the
+    number of positions visited along the way.
+    """
+    if outcome(x, o) is not None:
+        return 1, 1
+    games = 0
+    positions = 1
+    x_turn = COUNTS[x] == COUNTS[o]
+    for cell in CELLS[FULL & ~(x | o)]:
+        if x_turn:
+            g, p = count_games(x | 1 << cell, o)
+        else:
+            g, p = count_games(x, o | 1 << cell)
+        games += g
+        positions += p
+    return games, positions
+
+
+# The API of tictactoe.py on list of lists boards
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return to_board(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if x_to_move(*from_board(board)) else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return [divmod(cell, 3) for cell in moves(*from_board(board))]
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise Exception("not a valid move")
+    return to_board(*play(*from_board(board), 3 * i + j))
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = from_board(board)
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return outcome(*from_board(board)) is not None
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return outcome(*from_board(board)) or 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    x, o = from_board(board)
+    if outcome(x, o) is not None:
+        return None
+    best = None
+    if x_to_move(x, o):
+        for cell in moves(x, o):
+            v = value(x | 1 << cell, o)
+            if best is None or v > best[0]:
+                best = (v, cell)
+    else:
+        for cell in moves(x, o):
+            v = value(x, o | 1 << cell)
+            if best is None or v < best[0]:
+                best = (v, cell)
+    return divmod(best[1], 3)
@@ -0,0 +1,131 @@
+"""
+Builds and checks the Tic Tac Toe opening book, tictactoe.book.
+
+Every position that can come up in play is enumerated once from the
+initial state and solved by the search in tictactoe.py. Its value and
+best move are stored in one byte at its base 3 index, as described in
+tictactoe.py, which loads the book at import so that minimax is a single
+lookup.
+
+--check compares every entry of the book with a fresh search, and every
+book move with the value of the position, and fails on any difference.
+
+Usage: python book.py [--check] [--output FILE]
+"""
+
+import argparse
+import sys
+
+import tictactoe as ttt
+
+
+def reachable(board, positions):
+    """Adds every position reachable from board to positions, by index."""
+    index = ttt.board_index(board)
+    if index in positions:
+        return
+    positions[index] = board
+    if not ttt.terminal(board):
+        for action in ttt.actions(board):
+            reachable(ttt.result(board, action), positions)
+
+
+def value(board):
+    """Returns the minimax value of a board from a full-window search."""
+    if ttt.player(board) == ttt.X:
+        return ttt.MAX_VALUE(board)
+    return ttt.MIN_VALUE(board)
+
+
+def build():
+    """Returns the book entries, searching every reachable position."""
+    saved, ttt.book = ttt.book, None
+    if ttt.table is None:
+        ttt.load_table()
+    try:
+        positions = {}
+        reachable(ttt.initial_state(), positions)
+        entries = bytearray([ttt.UNREACHABLE]) * ttt.BOOK_SIZE
+        for index, board in positions.items():
+            move = ttt.NO_MOVE
+            if not ttt.terminal(board):
+                i, j = ttt.minimax(board)
+                move = 3 * i + j
+            entries[index] = (value(board) + 1) << 4 | move
+    finally:
+        ttt.book = saved
+    return bytes(entries)
+
+
+def check(entries):
+    """
+    Returns a list of differences between book entries and the search,
+    empty if they agree on every position.
+    """
+    # Search with an empty table rather than one read from disk
+    saved, ttt.book = ttt.book, None
+    saved_table, ttt.table = ttt.table, {}
+    errors = []
+    try:
+        positions = {}
+        reachable(ttt.initial_state(), positions)
+        for index in range(ttt.BOOK_SIZE):
+            entry = entries[index]
+            board = positions.get(index)
+            if board is None:
+                if entry != ttt.UNREACHABLE:
+                    errors.append(f"unreachable board {index} has an entry")
+                continue
+            if entry == ttt.UNREACHABLE:
+                errors.append(f"board {board} is missing")
+                continue
+            expected = value(board)
+            if (entry >> 4) - 1 != expected:
+                errors.append(f"board {board} has value {(entry >> 4) - 1}, "
+                              f"expected {expected}")
+            move = entry & 15
+            if ttt.terminal(board):
+                if move != ttt.NO_MOVE:
+                    errors.append(f"finished board {board} has a move")
+            elif (move >= 9 or board[move // 3][move % 3] != ttt.EMPTY
+                    or value(ttt.result(board, divmod(move, 3))) != expected):
+                errors.append(f"board {board} has a losing move {move}")
+    finally:
+        ttt.book = saved
+        ttt.table = saved_table
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or check the Tic Tac Toe opening book."
+    )
+    parser.add_argument("--check", action="store_true",
+                        help="check the book against the search instead")
+    parser.add_argument("--output", default=ttt.BOOK_FILE,
+                        help="book file (default: tictactoe.book)")
+    args = parser.parse_args()
+
+    if args.check:
+        entries = ttt.load_book(args.output)
+        if entries is None:
+            sys.exit(f"No valid book at {args.output}.")
+        errors = check(entries)
+        for error in errors[:20]:
+            print(error)
+        if errors:
+            sys.exit(f"{len(errors)} entries disagree with the search.")
+        reached = sum(entry != ttt.UNREACHABLE for entry in entries)
+        print(f"All {reached} positions agree with the search.")
+        return
+
+    entries = build()
+    with open(args.output, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(entries)
+    reached = sum(entry != ttt.UNREACHABLE for entry in entries)
+    print(f"{reached} positions written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
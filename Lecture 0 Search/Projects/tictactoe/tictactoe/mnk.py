@@ -0,0 +1,351 @@
+"""
+m,n,k-game engine: Tic Tac Toe generalized to a board of any number of
+rows and columns, won by the first player with k marks in a row. 3,3,3
+is Tic Tac Toe and 15,15,5 is Gomoku.
+
+A Game keeps the public API of tictactoe.py (initial_state, player,
+actions, result, winner, terminal, utility and minimax) for its board
+size. Boards are indexed as board[i][j] like the list of lists boards of
+tictactoe.py, but also remember their last move and winner. result only
+looks for a line through the move just made, so winner and terminal are
+immediate.
+
+Larger boards cannot be searched to the end, so minimax runs iterative
+deepening alpha-beta search within a wall-clock budget, scoring the
+positions where it stops with a heuristic evaluation, and plays the best
+move of the deepest search it completed.
+
+Usage: python mnk.py ROWS COLS K [--budget SECONDS]
+"""
+
+import argparse
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Line directions checked through each move
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Board():
+    """
+    Immutable m,n,k-game board: cells row by row, plus the last move, the
+    number of marks and the winner, if any.
+    """
+
+    def __init__(self, rows, cols, cells, last=None, moves=0, winner=None):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.last = last
+        self.moves = moves
+        self.winner = winner
+
+    def __getitem__(self, i):
+        return self.cells[i * self.cols:(i + 1) * self.cols]
+
+    def __repr__(self):
+        return "\n".join(
+            "".join(cell or "." for cell in self[i]) for i in range(self.rows)
+        )
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Game():
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if rows < 1 or cols < 1:
+            raise ValueError("board must have at least one cell")
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError(f"k must be between 1 and {max(rows, cols)}")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+
+        # Every line of k cells, as tuples of flat indices
+        self.windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.windows.append(tuple(
+                            (i + di * n) * cols + j + dj * n for n in range(k)
+                        ))
+
+        # Cells on more lines are tried first: on a 3x3 board the center,
+        # then the corners, then the edges. Large boards have a plateau of
+        # cells on equally many lines, so ties go to the cell nearer the
+        # center
+        weights = [0] * (rows * cols)
+        for window in self.windows:
+            for cell in window:
+                weights[cell] += 1
+
+        def rank(cell):
+            i, j = divmod(cell, cols)
+            return -weights[cell], abs(2 * i - rows + 1) + abs(2 * j - cols + 1)
+
+        self.order = sorted(range(rows * cols), key=rank)
+
+        # Window scores by number of marks, so longer lines count for more,
+        # and the score of a win, less the number of marks on the board,
+        # which is above any heuristic score
+        self.scores = [0] + [4 ** n for n in range(1, k + 1)]
+        self.win = len(self.windows) * self.scores[k] + rows * cols + 1
+
+        # Statistics of the last minimax search
+        self.nodes = 0
+        self.last_search = None
+
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return Board(self.rows, self.cols, [EMPTY] * (self.rows * self.cols))
+
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        return X if board.moves % 2 == 0 else O
+
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return [divmod(cell, self.cols)
+                for cell, mark in enumerate(board.cells) if mark is EMPTY]
+
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise Exception("not a valid move")
+        cell = i * self.cols + j
+        if board.cells[cell] is not EMPTY or self.terminal(board):
+            raise Exception("not a valid move")
+        mark = self.player(board)
+        cells = list(board.cells)
+        cells[cell] = mark
+        won = mark if self._wins_at(cells, cell) else None
+        return Board(self.rows, self.cols, cells, action, board.moves + 1, won)
+
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        return board.winner
+
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (board.winner is not None
+                or board.moves == self.rows * self.cols)
+
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if board.winner == X:
+            return 1
+        if board.winner == O:
+            return -1
+        return 0
+
+
+    def _wins_at(self, cells, cell):
+        """Returns True if the mark on cell is part of k in a row."""
+        mark = cells[cell]
+        i, j = divmod(cell, self.cols)
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = i + sign * di, j + sign * dj
+                while (0 <= r < self.rows and 0 <= c < self.cols
+                       and cells[r * self.cols + c] == mark):
+                    count += 1
+                    r, c = r + sign * di, c + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+
+    def evaluate(self, cells, mark):
+        """
+        Returns a heuristic score of cells for the player of mark: every
+        line still open to only one player counts for that player, more
+        the more marks it already holds.
+        """
+        scores = self.scores
+        score = 0
+        for window in self.windows:
+            mine = theirs = 0
+            for cell in window:
+                if cells[cell] is EMPTY:
+                    continue
+                if cells[cell] == mark:
+                    mine += 1
+                else:
+                    theirs += 1
+            if not theirs:
+                score += scores[mine]
+            elif not mine:
+                score -= scores[theirs]
+        return score
+
+
+    def candidates(self, cells, moves):
+        """
+        Returns the empty cells worth searching, best first. On boards too
+        large to search to the end, only cells next to a mark are tried.
+        """
+        if moves == 0 or self.rows * self.cols <= 16:
+            return [cell for cell in self.order if cells[cell] is EMPTY]
+        near = []
+        for cell in self.order:
+            if cells[cell] is not EMPTY:
+                continue
+            i, j = divmod(cell, self.cols)
+            for r in range(max(i - 1, 0), min(i + 2, self.rows)):
+                row = r * self.cols
+                if any(cells[row + c] is not EMPTY
+                       for c in range(max(j - 1, 0), min(j + 2, self.cols))):
+                    near.append(cell)
+                    break
+        return near
+
+
+    def minimax(self, board, budget=None, max_depth=None):
+        """
+        Returns the best action for the current player on the board, found
+        by iterative deepening alpha-beta search. With a budget, in seconds,
+        searching stops when it runs out and the move of the deepest
+        completed search is played. A search that is cut short leaves its
+        working copy of the cells half played, so it is discarded. The
+        depth, value, nodes and time of the search are left in last_search.
+        """
+        if self.terminal(board):
+            return None
+        start = time.perf_counter()
+        deadline = None if budget is None else start + budget
+        cells = list(board.cells)
+        mark = self.player(board)
+        empty = self.rows * self.cols - board.moves
+        moves = self.candidates(cells, board.moves)
+        self.nodes = 0
+
+        best, value, depth = moves[0], 0, 0
+        for depth in range(1, min(empty, max_depth or empty) + 1):
+            try:
+                value, move = self._root(cells, mark, board.moves, depth,
+                                         moves, deadline)
+            except _Timeout:
+                depth -= 1
+                break
+            best = move
+
+            # Try the best move first at the next depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) >= self.win - self.rows * self.cols:
+                break
+
+        self.last_search = {
+            "depth": depth,
+            "value": value,
+            "nodes": self.nodes,
+            "seconds": time.perf_counter() - start
+        }
+        return divmod(best, self.cols)
+
+
+    def _root(self, cells, mark, moves, depth, candidates, deadline):
+        """Returns (value, move) of the best of candidates at a depth."""
+        other = O if mark == X else X
+        alpha, beta = -self.win - 1, self.win + 1
+        best = None
+        for cell in candidates:
+            cells[cell] = mark
+            if self._wins_at(cells, cell):
+                v = self.win - moves - 1
+            else:
+                v = -self._negamax(cells, other, moves + 1, depth - 1,
+                                   -beta, -alpha, deadline)
+            cells[cell] = EMPTY
+            if best is None or v > alpha:
+                alpha, best = v, cell
+        return alpha, best
+
+
+    def _negamax(self, cells, mark, moves, depth, alpha, beta, deadline):
+        """
+        Returns the value of cells for the player of mark, to move, with
+        moves marks already placed. Moves are made and undone in place.
+        """
+        self.nodes += 1
+        if (deadline is not None and self.nodes & 63 == 0
+                and time.perf_counter() > deadline):
+            raise _Timeout
+        if moves == self.rows * self.cols:
+            return 0
+        if depth == 0:
+            return self.evaluate(cells, mark)
+
+        other = O if mark == X else X
+        for cell in self.candidates(cells, moves):
+            cells[cell] = mark
+            if self._wins_at(cells, cell):
+                v = self.win - moves - 1
+            else:
+                v = -self._negamax(cells, other, moves + 1, depth - 1,
+                                   -beta, -alpha, deadline)
+            cells[cell] = EMPTY
+            if v > alpha:
+                alpha = v
+                if alpha >= beta:
+                    break
+        return alpha
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play an m,n,k-game against itself."
+    )
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("k", type=int)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds per move (default: 1)")
+    args = parser.parse_args()
+
+    game = Game(args.rows, args.cols, args.k)
+    board = game.initial_state()
+    while not game.terminal(board):
+        move = game.minimax(board, args.budget)
+        search = game.last_search
+        print(f"{game.player(board)} plays {move}: depth {search['depth']}, "
+              f"{search['nodes']} nodes in {search['seconds']:.2f}s")
+        board = game.result(board, move)
+    print(board)
+    winner = game.winner(board)
+    print("Tie." if winner is None else f"{winner} wins.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,10 @@ import time
 
 import tictactoe as ttt
 
+# python runner.py --bitboard plays with the bitboard engine instead
+if "--bitboard" in sys.argv:
+    import bitboard as ttt
+
 pygame.init()
 size = width, height = 600, 400
 
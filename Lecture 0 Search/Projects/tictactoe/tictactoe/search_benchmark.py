@@ -0,0 +1,107 @@
+"""
+Checks tictactoe.minimax against exhaustive minimax on every reachable
+position, and times it per position.
+
+Each position is searched from an empty transposition table, once with
+the center and corners tried first and once in row order, so the node
+counts show what a single search saves by pruning and move ordering
+rather than by reusing a solved table.
+Exhaustive minimax is the bitboard search of bitboard.py with no pruning.
+
+Usage: python search_benchmark.py
+"""
+
+import statistics
+import time
+
+import bitboard
+import tictactoe as ttt
+
+ROW_ORDER = [(i, j) for i in range(3) for j in range(3)]
+
+
+def exhaustive(x, o):
+    """Returns (value, nodes) of a bitboard position without pruning."""
+    score = bitboard.outcome(x, o)
+    if score is not None:
+        return score, 1
+    nodes = 1
+    values = []
+    x_turn = bitboard.x_to_move(x, o)
+    for cell in bitboard.moves(x, o):
+        if x_turn:
+            v, n = exhaustive(x | 1 << cell, o)
+        else:
+            v, n = exhaustive(x, o | 1 << cell)
+        values.append(v)
+        nodes += n
+    return (max(values) if x_turn else min(values)), nodes
+
+
+def reachable(board, positions):
+    """Adds every non-terminal position reachable from board to positions."""
+    key = str(board)
+    if key in positions or ttt.terminal(board):
+        return
+    positions[key] = board
+    for action in ttt.actions(board):
+        reachable(ttt.result(board, action), positions)
+
+
+def search(board, order):
+    """
+    Returns (move, nodes, seconds) for one minimax call on board from an
+    empty table, trying moves in order.
+    """
+    ttt.MOVE_ORDER = order
+    ttt.table = {}
+    start = time.perf_counter()
+    move = ttt.minimax(board)
+    elapsed = time.perf_counter() - start
+    return move, ttt.last_call["nodes"], elapsed
+
+
+def main():
+    positions = {}
+    reachable(ttt.initial_state(), positions)
+    print(f"{len(positions)} reachable positions with a move to make.")
+
+    # Search every position rather than reading the opening book
+    default_order = ttt.MOVE_ORDER
+    book, ttt.book = ttt.book, None
+    results = {"exhaustive": ([], []), "row order": ([], []),
+               "ordered": ([], [])}
+    for board in positions.values():
+        x, o = bitboard.from_board(board)
+        start = time.perf_counter()
+        expected, nodes = exhaustive(x, o)
+        results["exhaustive"][0].append(nodes)
+        results["exhaustive"][1].append(time.perf_counter() - start)
+
+        for name, order in (("row order", ROW_ORDER),
+                            ("ordered", default_order)):
+            move, nodes, elapsed = search(board, order)
+            results[name][0].append(nodes)
+            results[name][1].append(elapsed)
+
+            # The chosen move must keep the exhaustive value
+            value, _ = exhaustive(*bitboard.from_board(ttt.result(board, move)))
+            if value != expected:
+                raise Exception(f"{name} plays {move} on {board}: value "
+                                f"{value}, expected {expected}")
+    ttt.MOVE_ORDER = default_order
+    ttt.table = None
+    ttt.book = book
+
+    print("Every move matches exhaustive minimax.")
+    print(f"{'search':<12}{'nodes':>10}{'mean':>10}{'max':>8}"
+          f"{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}")
+    for name, (nodes, seconds) in results.items():
+        print(f"{name:<12}{sum(nodes):>10}{statistics.mean(nodes):>10.1f}"
+              f"{max(nodes):>8}{statistics.mean(seconds) * 1000:>10.3f}"
+              f"{statistics.median(seconds) * 1000:>10.3f}"
+              f"{max(seconds) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,47 @@
 Tic Tac Toe Player
 """
 
+import json
 import math
 import copy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Transposition table file, kept next to this module
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "tictactoe.table")
+TABLE_VERSION = 1
+
+# Opening book file, shipped next to this module and built by book.py.
+# It holds a byte for every base 3 board index: the value of the board
+# plus one in the high bits and the best move, 3 * i + j, in the low four
+# bits (NO_MOVE on finished games), or UNREACHABLE for boards that
+# cannot come up in play
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "tictactoe.book")
+BOOK_MAGIC = b"TTTBOOK\0"
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 15
+UNREACHABLE = 255
+
+# Moves tried first by the search: center, then corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Exact minimax values by canonical board key, loaded on the first minimax call
+table = None
+
+# Opening book entries, loaded at import, or None to always search
+book = None
+
+# Search counters since import, and for the most recent minimax call
+stats = {"calls": 0, "nodes": 0, "lookups": 0, "hits": 0}
+last_call = {"nodes": 0, "lookups": 0, "hits": 0}
+
+
 
 def initial_state():
     """
@@ -146,51 +180,234 @@ def utility(board):
     # raise NotImplementedError
 
 
+def _symmetries():
+    """
+    Returns the 8 rotations and reflections of the board, each as the
+    list of cells, numbered 3 * i + j, read in row order under it.
+    """
+    symmetries = []
+    for turns in range(4):
+        for mirror in (False, True):
+            cells = []
+            for row in range(3):
+                for col in range(3):
+                    i, j = row, (2 - col if mirror else col)
+                    for _ in range(turns):
+                        i, j = j, 2 - i
+                    cells.append(3 * i + j)
+            symmetries.append(cells)
+    return symmetries
+
+
+SYMMETRIES = _symmetries()
+
+
+def canonical(board):
+    """
+    Returns a key for the board that is the same for all 8 rotations and
+    reflections of it: the smallest of their base 3 encodings.
+    """
+    digits = ["1" if cell == X else "2" if cell == O else "0"
+              for row in board for cell in row]
+    return min(int("".join(digits[k] for k in cells), 3)
+               for cells in SYMMETRIES)
+
+
+def board_index(board):
+    """
+    Returns the base 3 index of the board, with cell (i, j) as digit
+    3 * i + j, counting EMPTY as 0, X as 1 and O as 2.
+    """
+    index = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            index = 3 * index + (1 if cell == X else 2 if cell == O else 0)
+    return index
+
+
+def load_book(path=BOOK_FILE):
+    """
+    Returns the opening book entries stored at path, or None if there is
+    no valid book there.
+    """
+    try:
+        with open(path, "rb") as f:
+            contents = f.read()
+    except OSError:
+        return None
+    if (not contents.startswith(BOOK_MAGIC)
+            or len(contents) != len(BOOK_MAGIC) + BOOK_SIZE):
+        return None
+    return contents[len(BOOK_MAGIC):]
+
+
+def load_table(path=TABLE_FILE):
+    """
+    Loads the transposition table from path. If there is none, or it is
+    unreadable, solves the whole game from the initial state to fill the
+    table and writes it to path.
+    """
+    global table
+    try:
+        with open(path) as f:
+            contents = json.load(f)
+        if contents["version"] == TABLE_VERSION:
+            table = {int(key): value
+                     for key, value in contents["values"].items()}
+            return
+    except (OSError, ValueError, KeyError):
+        pass
+    table = {}
+    _solve(initial_state(), set())
+    save_table(path)
+
+
+def _solve(board, seen):
+    """
+    Searches every position reachable from board with a full window, so
+    each gets an exact value in the table.
+    """
+    key = canonical(board)
+    if key in seen:
+        return
+    seen.add(key)
+    if player(board) == X:
+        MAX_VALUE(board)
+    else:
+        MIN_VALUE(board)
+    if not terminal(board):
+        for action in actions(board):
+            _solve(result(board, action), seen)
+
+
+def save_table(path=TABLE_FILE):
+    """Writes the transposition table to path atomically."""
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump({"version": TABLE_VERSION, "values": table}, f)
+    os.replace(temporary, path)
+
+
+def table_stats():
+    """
+    Returns the search counters, with the table hit rate and the mean
+    number of nodes searched per minimax call.
+    """
+    report = dict(stats)
+    report["size"] = 0 if table is None else len(table)
+    report["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0
+    report["nodes_per_call"] = stats["nodes"] / stats["calls"] if stats["calls"] else 0
+    return report
+
+
+def ordered_actions(board):
+    """
+    Returns the possible actions on the board in MOVE_ORDER, so the moves
+    most likely to be best are searched first.
+    """
+    return [(i, j) for i, j in MOVE_ORDER if board[i][j] == EMPTY]
+
+
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
     if terminal(board):
         return None
+    if book is not None:
+        entry = book[board_index(board)]
+        if entry != UNREACHABLE:
+            stats["calls"] += 1
+            for counter in last_call:
+                last_call[counter] = 0
+            return divmod(entry & 15, 3)
+    if table is None:
+        load_table()
+    before = dict(stats)
     k=0
     best_move=()
     if player(board)==X:
         v= -math.inf
-        for action in actions(board):
-            k=MIN_VALUE(result(board,action))
+        for action in ordered_actions(board):
+            k=MIN_VALUE(result(board,action), v, math.inf)
             if k>v:
                 v=k
                 best_move=action
     if player(board)==O:
         v=math.inf
-        for action in actions(board):
-            k=MAX_VALUE(result(board,action))
+        for action in ordered_actions(board):
+            k=MAX_VALUE(result(board,action), -math.inf, v)
             if k<v:
                 v=k
                 best_move=action
+    stats["calls"] += 1
+    for counter in last_call:
+        last_call[counter] = stats[counter] - before[counter]
     return best_move
 
 
     # raise NotImplementedError
-def MIN_VALUE(board):
+def _lookup(key):
+    stats["lookups"] += 1
+    v = table.get(key)
+    if v is not None:
+        stats["hits"] += 1
+    return v
+def MIN_VALUE(board, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the value of the board for O to move, searched with alpha-beta
+    pruning. A value at or below alpha is only an upper bound, and one at
+    or above beta only a lower bound, so only values between them are
+    stored in the table.
+    """
+    key = canonical(board)
+    v = _lookup(key)
+    if v is not None:
+        return v
+    stats["nodes"] += 1
     if terminal(board):
-        return utility(board)
+        v = utility(board)
+        table[key] = v
+        return v
     v=math.inf
-    for action in actions(board):
-        v=min(v,MAX_VALUE(result(board,action)))
+    for action in ordered_actions(board):
+        v=min(v,MAX_VALUE(result(board,action), alpha, min(beta, v)))
+        if v <= alpha:
+            return v
+    if v < beta:
+        table[key] = v
+    return v
+def MAX_VALUE(board, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the value of the board for X to move, searched with alpha-beta
+    pruning, storing only exact values as MIN_VALUE does.
+    """
+    key = canonical(board)
+    v = _lookup(key)
+    if v is not None:
         return v
-def MAX_VALUE(board):
+    stats["nodes"] += 1
     if terminal(board):
-        return utility(board)
-    v=-math.inf
-    for action in actions(board):
-        v=max(v,MIN_VALUE(result(board,action)))
+        v = utility(board)
+        table[key] = v
         return v
+    v=-math.inf
+    for action in ordered_actions(board):
+        v=max(v,MIN_VALUE(result(board,action), max(alpha, v), beta))
+        if v >= beta:
+            return v
+    if v > alpha:
+        table[key] = v
+    return v
+
+book = load_book()
 
 if  __name__ == "__main__":
-    state = [[O, EMPTY, X],
-            [EMPTY, X, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
-    won = winner(state)
-    print(won)
-    # print("change main at line 190")
\ No newline at end of file
+    # Solve the game into the table file, then report one lookup
+    load_table()
+    move = minimax(initial_state())
+    print(f"Best opening move: {move}")
+    report = table_stats()
+    print(f"{report['size']} positions in table, "
+          f"hit rate {report['hit_rate']:.1%}, "
+          f"{last_call['nodes']} nodes searched by the last call")
@@ -0,0 +1,157 @@
+"""
+Headless tournament for the Tic Tac Toe AI.
+
+tictactoe.minimax plays many games against a random player, a greedy
+player (one that wins at once if it can, blocks an immediate loss if it
+must, and otherwise moves at random) and itself, taking X and O in turn.
+Games are spread over a pool of worker processes and every game is
+seeded, so a run can be repeated exactly.
+
+Every AI move is timed and its number of searched nodes recorded, and a
+table of outcomes and latency percentiles is printed at the end. Perfect
+play never loses, so the run fails if the AI loses a single game, which
+makes it a regression gate for changes to the engine. --search turns off
+the opening book and starts every AI move from an empty transposition
+table, so that each move exercises a full search.
+
+Usage: python tournament.py [--games N] [--workers N] [--seed S] [--search]
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+import tictactoe as ttt
+
+OPPONENTS = ("random", "greedy", "self")
+
+# Whether workers search every move from scratch
+_search = False
+
+
+def random_move(board, rng):
+    """Returns a random possible action."""
+    return rng.choice(ttt.actions(board))
+
+
+def greedy_move(board, rng):
+    """
+    Returns a winning action if there is one, else one that stops the
+    opponent winning next turn, else a random action.
+    """
+    me = ttt.player(board)
+    moves = ttt.actions(board)
+    for mark in (me, ttt.O if me == ttt.X else ttt.X):
+        for i, j in moves:
+            trial = [row[:] for row in board]
+            trial[i][j] = mark
+            if ttt.winner(trial) == mark:
+                return (i, j)
+    return rng.choice(moves)
+
+
+def play(game):
+    """
+    Plays one game, given as (opponent, mark of the AI, seed). Returns a
+    dict with the opponent, the AI's mark, the winner and the latency in
+    seconds and nodes searched of each AI move.
+    """
+    opponent, ai, seed = game
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    latencies = []
+    nodes = []
+    while not ttt.terminal(board):
+        if opponent == "self" or ttt.player(board) == ai:
+            if _search:
+                ttt.table = {}
+            start = time.perf_counter()
+            move = ttt.minimax(board)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(ttt.last_call["nodes"])
+        elif opponent == "greedy":
+            move = greedy_move(board, rng)
+        else:
+            move = random_move(board, rng)
+        board = ttt.result(board, move)
+    return {
+        "opponent": opponent,
+        "ai": ai,
+        "winner": ttt.winner(board),
+        "latencies": latencies,
+        "nodes": nodes
+    }
+
+
+def percentile(values, fraction):
+    """Returns the value at a fraction of the way through sorted values."""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _initialize(search):
+    global _search
+    _search = search
+    if search:
+        ttt.book = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play the Tic Tac Toe AI against other players."
+    )
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games per opponent (default: 1000)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--search", action="store_true",
+                        help="search every move instead of using the book")
+    args = parser.parse_args()
+
+    games = [(opponent, ttt.X if n % 2 == 0 else ttt.O,
+              args.seed * 1_000_003 + OPPONENTS.index(opponent) * args.games + n)
+             for opponent in OPPONENTS for n in range(args.games)]
+
+    totals = {opponent: {"wins": 0, "ties": 0, "losses": 0,
+                         "latencies": [], "nodes": 0, "moves": 0}
+              for opponent in OPPONENTS}
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers, initializer=_initialize,
+                              initargs=(args.search,)) as pool:
+        for game in pool.imap_unordered(play, games, chunksize=64):
+            total = totals[game["opponent"]]
+            if game["winner"] is None:
+                total["ties"] += 1
+            elif game["opponent"] == "self" or game["winner"] != game["ai"]:
+                total["losses"] += 1
+            else:
+                total["wins"] += 1
+            total["latencies"].extend(game["latencies"])
+            total["nodes"] += sum(game["nodes"])
+            total["moves"] += len(game["nodes"])
+    elapsed = time.perf_counter() - start
+
+    print(f"{'opponent':<10}{'wins':>7}{'ties':>7}{'losses':>8}"
+          f"{'nodes/move':>12}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}"
+          f"{'max us':>10}")
+    losses = 0
+    for opponent, total in totals.items():
+        latencies = sorted(total["latencies"])
+        moves = total["moves"] or 1
+        print(f"{opponent:<10}{total['wins']:>7}{total['ties']:>7}"
+              f"{total['losses']:>8}{total['nodes'] / moves:>12.1f}"
+              + "".join(f"{percentile(latencies, p) * 1e6:>10.1f}"
+                        for p in (0.5, 0.9, 0.99, 1)))
+        losses += total["losses"]
+    print(f"{len(games)} games in {elapsed:.2f}s.")
+
+    if losses:
+        sys.exit(f"The AI lost {losses} games.")
+
+
+if __name__ == "__main__":
+    main()
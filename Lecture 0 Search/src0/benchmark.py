@@ -0,0 +1,95 @@
+"""
+Scaling benchmark for the maze solvers on generated mazes.
+
+For every style, size and algorithm, generates a seeded maze, solves it
+and writes one CSV row with the solve time, states explored, solution
+length and peak memory allocated while solving. Memory is measured with
+tracemalloc in a separate run, since tracing slows the solver down.
+
+Usage: python benchmark.py [--styles backtracker,prim,open]
+                           [--sizes 100,1000] [--algorithms astar,jps]
+                           [--seed S] [--no-memory] [--output FILE]
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from generate import STYLES, generate
+from maze import Maze
+
+FIELDS = ["style", "size", "seed", "algorithm", "seconds",
+          "explored", "length", "peak_kb"]
+
+
+def solve(maze, algorithm):
+    """Returns (seconds, solution length or None) for one solve."""
+    start = time.perf_counter()
+    try:
+        maze.solve(algorithm)
+        length = len(maze.solution[1])
+    except Exception as e:
+        if str(e) != "no solution":
+            raise
+        length = None
+    return time.perf_counter() - start, length
+
+
+def peak_kb(maze, algorithm):
+    """Returns the peak memory allocated while solving, in kilobytes."""
+    tracemalloc.start()
+    try:
+        solve(maze, algorithm)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze solvers.")
+    parser.add_argument("--styles", default=",".join(STYLES))
+    parser.add_argument("--sizes", default="100,300,1000")
+    parser.add_argument("--algorithms", default="bfs,greedy,astar,jps")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc run")
+    parser.add_argument("--output", help="CSV file to write (default: stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for style in args.styles.split(","):
+            for size in map(int, args.sizes.split(",")):
+                filename = os.path.join(tmp, f"{style}-{size}.txt")
+                with open(filename, "w") as f:
+                    f.write(generate(style, size, size, args.seed))
+                maze = Maze(filename)
+                for algorithm in args.algorithms.split(","):
+                    seconds, length = solve(maze, algorithm)
+                    writer.writerow({
+                        "style": style,
+                        "size": size,
+                        "seed": args.seed,
+                        "algorithm": algorithm,
+                        "seconds": f"{seconds:.6f}",
+                        "explored": maze.num_explored,
+                        "length": "" if length is None else length,
+                        "peak_kb": ("" if args.no_memory
+                                    else peak_kb(maze, algorithm))
+                    })
+                    out.flush()
+
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
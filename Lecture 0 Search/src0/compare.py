@@ -0,0 +1,63 @@
+"""
+Compares the maze search algorithms on the sample mazes and on large
+generated ones, reporting states explored, solution length and time.
+
+Usage: python compare.py [--size N] [--generated COUNT] [--seed S]
+                         [--algorithms dfs,bfs,...]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from generate import generate
+from maze import Maze
+
+SAMPLES = ["maze1.txt", "maze2.txt", "maze3.txt"]
+
+
+def run(filename, algorithms):
+    """Solves one maze file with each algorithm and prints a table row each."""
+    maze = Maze(filename)
+    name = os.path.basename(filename)
+    for algorithm in algorithms:
+        start = time.perf_counter()
+        try:
+            maze.solve(algorithm)
+            length = len(maze.solution[1])
+        except Exception as e:
+            if str(e) != "no solution":
+                raise
+            length = "-"
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20}{algorithm:<10}{maze.num_explored:>12}"
+              f"{length:>10}{elapsed:>12.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare maze solvers.")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--generated", type=int, default=1,
+                        help="number of generated mazes (default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--algorithms", default=",".join(Maze.ALGORITHMS))
+    args = parser.parse_args()
+    algorithms = args.algorithms.split(",")
+
+    print(f"{'maze':<20}{'algorithm':<10}{'explored':>12}"
+          f"{'length':>10}{'seconds':>12}")
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for sample in SAMPLES:
+        run(os.path.join(directory, sample), algorithms)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.generated):
+            filename = os.path.join(tmp, f"generated{i}-{args.size}.txt")
+            with open(filename, "w") as f:
+                f.write(generate("open", args.size, args.size, args.seed + i))
+            run(filename, algorithms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Seeded maze generator writing the maze*.txt format: "#" for walls,
+spaces for open cells, "A" for the start and "B" for the goal.
+
+Styles:
+    backtracker  perfect maze carved by a randomized depth-first search
+    prim         perfect maze grown by randomized Prim's algorithm
+    open         open field with randomly placed obstacles
+
+The start is placed in the open cell nearest the top-left corner and the
+goal in the open cell nearest the bottom-right corner.
+
+Usage: python generate.py STYLE HEIGHT WIDTH [--seed S] [--density D]
+                          [--output FILE]
+"""
+
+import argparse
+import random
+import sys
+
+STYLES = ("backtracker", "prim", "open")
+
+WALL = 1
+OPEN = 0
+
+
+def generate(style, height, width, seed=0, density=0.25):
+    """
+    Returns the maze text for a style, size and seed. density is the
+    fraction of walls in an open field.
+    """
+    if style not in STYLES:
+        raise ValueError(f"unknown style {style}")
+    if height < 2 or width < 2:
+        raise ValueError("maze must be at least 2x2")
+    rng = random.Random(seed)
+    if style == "open":
+        grid = open_field(height, width, rng, density)
+    elif style == "prim":
+        grid = prim(height, width, rng)
+    else:
+        grid = backtracker(height, width, rng)
+    return render(grid, height, width)
+
+
+def open_field(height, width, rng, density):
+    """
+    Returns a flat grid with each cell a wall with probability density.
+    A random staircase of right and down moves from the top-left to the
+    bottom-right corner is kept open so the maze is always solvable.
+    """
+    threshold = int(density * 256)
+    noise = rng.randbytes(height * width)
+    grid = bytearray(noise.translate(
+        bytes(WALL if b < threshold else OPEN for b in range(256))
+    ))
+    row, col = 0, 0
+    grid[0] = OPEN
+    while (row, col) != (height - 1, width - 1):
+        if col == width - 1 or row < height - 1 and rng.random() < 0.5:
+            row += 1
+        else:
+            col += 1
+        grid[row * width + col] = OPEN
+    return grid
+
+
+def _rooms(height, width):
+    """
+    Returns the number of room rows and columns of a perfect maze. Rooms
+    sit at even coordinates with walls between them.
+    """
+    return (height + 1) // 2, (width + 1) // 2
+
+
+def backtracker(height, width, rng):
+    """Carves a perfect maze with an iterative randomized depth-first search."""
+    grid = bytearray([WALL]) * (height * width)
+    rows, cols = _rooms(height, width)
+    visited = bytearray(rows * cols)
+
+    stack = [(0, 0)]
+    visited[0] = 1
+    grid[0] = OPEN
+    while stack:
+        row, col = stack[-1]
+        options = []
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols and not visited[r * cols + c]:
+                options.append((r, c))
+        if not options:
+            stack.pop()
+            continue
+        r, c = options[rng.randrange(len(options))]
+        visited[r * cols + c] = 1
+        grid[(row + r) * width + (col + c)] = OPEN
+        grid[2 * r * width + 2 * c] = OPEN
+        stack.append((r, c))
+    return grid
+
+
+def prim(height, width, rng):
+    """Grows a perfect maze with randomized Prim's algorithm."""
+    grid = bytearray([WALL]) * (height * width)
+    rows, cols = _rooms(height, width)
+    visited = bytearray(rows * cols)
+
+    # Walls between a visited room and a neighboring room, as room pairs
+    frontier = []
+
+    def visit(row, col):
+        visited[row * cols + col] = 1
+        grid[2 * row * width + 2 * col] = OPEN
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols and not visited[r * cols + c]:
+                frontier.append((row, col, r, c))
+
+    visit(0, 0)
+    while frontier:
+        # Remove a random wall by swapping it with the last one
+        i = rng.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        row, col, r, c = frontier.pop()
+        if visited[r * cols + c]:
+            continue
+        grid[(row + r) * width + (col + c)] = OPEN
+        visit(r, c)
+    return grid
+
+
+def render(grid, height, width):
+    """
+    Returns the text of a flat grid, with the start and goal placed in
+    the open cells nearest the top-left and bottom-right corners.
+    """
+    start = grid.find(OPEN)
+    goal = grid.rfind(OPEN)
+    if start == -1 or start == goal:
+        raise ValueError("maze has fewer than two open cells")
+
+    text = bytearray(grid.translate(bytes([ord(" "), ord("#")]) + bytes(254)))
+    text[start] = ord("A")
+    text[goal] = ord("B")
+    return "\n".join(
+        text[i * width:(i + 1) * width].decode("ascii")
+        for i in range(height)
+    ) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a maze.")
+    parser.add_argument("style", choices=STYLES)
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--density", type=float, default=0.25,
+                        help="fraction of walls for open fields")
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    args = parser.parse_args()
+
+    text = generate(args.style, args.height, args.width,
+                    args.seed, args.density)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import argparse
+import heapq
+import itertools
 import sys
+from collections import deque
 
 class Node():
     def __init__(self, state, parent, action):
@@ -9,13 +13,17 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Number of nodes in the frontier for each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,10 +32,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self._discard(node.state)
             return node
 
+    def _discard(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -35,12 +50,53 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self._discard(node.state)
             return node
 
+
+class CellMask():
+    """
+    Read-only set of (row, col) cells backed by a flat array of flags,
+    so large searches need not build millions of tuples.
+    """
+
+    def __init__(self, flags, width):
+        self.flags = flags
+        self.width = width
+        self.count = int(flags.sum())
+
+    def __contains__(self, state):
+        row, col = state
+        return (0 <= col < self.width and 0 <= row
+                and row * self.width + col < len(self.flags)
+                and bool(self.flags[row * self.width + col]))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in self.flags.nonzero()[0].tolist():
+            yield divmod(index, self.width)
+
+
+# Maps each byte of a maze file to 1 for a wall or 0 for an open cell
+WALL_TABLE = bytes(0 if chr(b) in " AB" else 1 for b in range(256))
+
+# Maps each grid byte back to a character for printing
+TEXT_TABLE = b" #" + bytes(254)
+
+# Default cell size of images, in pixels, and the longest side the
+# default shrinks cells to stay within
+CELL_SIZE = 50
+IMAGE_SIDE = 4000
+
+
 class Maze():
 
+    # Search algorithms accepted by solve
+    ALGORITHMS = ("dfs", "bfs", "greedy", "astar", "jps", "wavefront")
+
     def __init__(self, filename):
 
         # Read file and set height and width of maze
@@ -58,78 +114,102 @@ class Maze():
         self.height = len(contents)
         self.width = max(len(line) for line in contents)
 
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        # Keep track of walls as one byte per cell, row by row, so that
+        # cell (i, j) has the flat index i * width + j
+        self.grid = bytearray(self.height * self.width)
+        for i, line in enumerate(contents):
+            if "A" in line:
+                self.start = (i, line.index("A"))
+            if "B" in line:
+                self.goal = (i, line.index("B"))
+            row = line.encode("latin-1", "replace").translate(WALL_TABLE)
+            self.grid[i * self.width:i * self.width + len(row)] = row
 
         self.solution = None
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
-        print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
-        print()
+        """Prints the maze, one buffered write per call."""
+        text = bytearray(self.grid.translate(TEXT_TABLE))
+        if self.solution is not None:
+            for i, j in self.solution[1]:
+                text[i * self.width + j] = ord("*")
+        text[self.index(self.start)] = ord("A")
+        text[self.index(self.goal)] = ord("B")
+
+        rows = [text[i * self.width:(i + 1) * self.width].decode("ascii")
+                for i in range(self.height)]
+        sys.stdout.write("\n" + "\n".join(rows).replace("#", "█") + "\n\n")
+
+
+    @property
+    def walls(self):
+        """Rows of the grid, in which a true cell is a wall."""
+        grid = memoryview(self.grid)
+        return [grid[i * self.width:(i + 1) * self.width]
+                for i in range(self.height)]
+
+
+    def index(self, state):
+        """Returns the flat grid index of a (row, col) state."""
+        return state[0] * self.width + state[1]
+
+
+    def state(self, index):
+        """Returns the (row, col) state of a flat grid index."""
+        return divmod(index, self.width)
 
 
     def neighbors(self, state):
         row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
+        grid = self.grid
+        i = row * self.width + col
 
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        if row > 0 and not grid[i - self.width]:
+            result.append(("up", (row - 1, col)))
+        if row < self.height - 1 and not grid[i + self.width]:
+            result.append(("down", (row + 1, col)))
+        if col > 0 and not grid[i - 1]:
+            result.append(("left", (row, col - 1)))
+        if col < self.width - 1 and not grid[i + 1]:
+            result.append(("right", (row, col + 1)))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def solve(self, algorithm="dfs"):
+        """
+        Finds a solution to maze, if one exists, using one of ALGORITHMS:
+        depth-first or breadth-first search, greedy best-first search,
+        A* search or jump point search, which are guided by the Manhattan
+        distance to the goal, or a breadth-first wavefront expanded with
+        NumPy array operations.
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm}")
 
         # Keep track of number of states explored
         self.num_explored = 0
+        self.explored = set()
+        self.solution = None
+        getattr(self, f"_solve_{algorithm}")()
+
+
+    def _solve_dfs(self):
+        self._solve_uninformed(StackFrontier())
+
+
+    def _solve_bfs(self):
+        self._solve_uninformed(QueueFrontier())
+
+
+    def _solve_uninformed(self, frontier):
+        """Searches the maze using a stack or queue frontier."""
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
         frontier.add(start)
 
-        # Initialize an empty explored set
-        self.explored = set()
-
         # Keep looping until solution found
         while True:
 
@@ -164,66 +244,351 @@ class Maze():
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
+    def heuristic(self, state):
+        """Manhattan distance from a state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+    def _solve_greedy(self):
+        self._solve_informed(lambda cost, state: self.heuristic(state))
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+    def _solve_astar(self):
+        self._solve_informed(lambda cost, state: cost + self.heuristic(state))
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+    def _solve_informed(self, priority):
+        """
+        Best-first search over a heap ordered by priority(cost, state),
+        with ties broken in favour of the most recently added state.
+        """
+        counter = itertools.count()
+        parents = {self.start: None}
+        costs = {self.start: 0}
+        frontier = [(priority(0, self.start), 0, self.start)]
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+        while frontier:
+            _, _, state = heapq.heappop(frontier)
+            if state in self.explored:
+                continue
+            self.num_explored += 1
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+            if state == self.goal:
+                self._set_solution(parents)
+                return
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
+            self.explored.add(state)
+            cost = costs[state] + 1
+            for action, neighbor in self.neighbors(state):
+                if neighbor in self.explored or costs.get(neighbor, cost + 1) <= cost:
+                    continue
+                costs[neighbor] = cost
+                parents[neighbor] = (action, state)
+                heapq.heappush(
+                    frontier,
+                    (priority(cost, neighbor), -next(counter), neighbor)
                 )
 
-        img.save(filename)
+        raise Exception("no solution")
+
+
+    def _set_solution(self, parents):
+        """Builds the solution from a map of state to (action, parent)."""
+        actions = []
+        cells = []
+        state = self.goal
+        while parents[state] is not None:
+            action, parent = parents[state]
+            actions.append(action)
+            cells.append(state)
+            state = parent
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+    def _open(self, row, col):
+        return (0 <= row < self.height and 0 <= col < self.width
+                and not self.grid[row * self.width + col])
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+
+    def _jump_vertical(self, row, col, dr):
+        """
+        Moves vertically from (row, col) until reaching the goal, a wall,
+        or a cell with a forced horizontal neighbor.
+        """
+        while True:
+            row += dr
+            if not self._open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return row, col
+            for dc in (-1, 1):
+                if (self._open(row, col + dc)
+                        and not self._open(row - dr, col + dc)):
+                    return row, col
+
+
+    def _jump_horizontal(self, row, col, dc):
+        """
+        Moves horizontally from (row, col) until reaching the goal, a wall,
+        or a cell from which a vertical jump finds a jump point.
+        """
+        while True:
+            col += dc
+            if not self._open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return row, col
+            if (self._jump_vertical(row, col, -1) is not None
+                    or self._jump_vertical(row, col, 1) is not None):
+                return row, col
+
+
+    def _jump_successors(self, state, direction):
+        """
+        Returns jump points reachable from state when it was entered moving
+        in direction (None for the start). Paths are kept canonical by
+        turning from vertical to horizontal only around an obstacle.
+        """
+        row, col = state
+        if direction is None:
+            jumps = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+        elif direction[0] == 0:
+            jumps = [direction, (-1, 0), (1, 0)]
+        else:
+            jumps = [direction]
+            for dc in (-1, 1):
+                if (self._open(row, col + dc)
+                        and not self._open(row - direction[0], col + dc)):
+                    jumps.append((0, dc))
+
+        successors = []
+        for dr, dc in jumps:
+            if dr == 0:
+                point = self._jump_horizontal(row, col, dc)
+            else:
+                point = self._jump_vertical(row, col, dr)
+            if point is not None:
+                successors.append((point, (dr, dc)))
+        return successors
+
+
+    def _solve_jps(self):
+        """
+        Jump point search: A* over the jump points of the 4-connected grid,
+        skipping the straight runs in between.
+        """
+        counter = itertools.count()
+        parents = {self.start: None}
+        costs = {self.start: 0}
+        frontier = [(self.heuristic(self.start), 0, self.start, None)]
+
+        while frontier:
+            _, _, state, direction = heapq.heappop(frontier)
+            if state in self.explored:
+                continue
+            self.num_explored += 1
+
+            if state == self.goal:
+                self._set_solution(self._expand_jumps(parents))
+                return
+
+            self.explored.add(state)
+            for point, step in self._jump_successors(state, direction):
+                cost = costs[state] + abs(point[0] - state[0]) + abs(point[1] - state[1])
+                if point in self.explored or costs.get(point, cost + 1) <= cost:
+                    continue
+                costs[point] = cost
+                parents[point] = state
+                heapq.heappush(
+                    frontier,
+                    (cost + self.heuristic(point), -next(counter), point, step)
+                )
+
+        raise Exception("no solution")
+
+
+    def _expand_jumps(self, jump_parents):
+        """
+        Converts parents between jump points into a map of every cell on
+        the path to (action, previous cell).
+        """
+        names = {(-1, 0): "up", (1, 0): "down", (0, -1): "left", (0, 1): "right"}
+        parents = {self.start: None}
+        state = self.goal
+        while jump_parents[state] is not None:
+            parent = jump_parents[state]
+            dr = (state[0] > parent[0]) - (state[0] < parent[0])
+            dc = (state[1] > parent[1]) - (state[1] < parent[1])
+            cell = state
+            while cell != parent:
+                previous = (cell[0] - dr, cell[1] - dc)
+                parents[cell] = (names[(dr, dc)], previous)
+                cell = previous
+            state = parent
+        return parents
+
+
+    def _wavefront(self, source, target=None):
+        """
+        Breadth-first search from source that expands a whole layer of
+        flat cell indices at once with NumPy, stopping early once target
+        is reached. Returns the distances over the grid padded with a
+        border of walls (-1 where unreached), the padded width, the number
+        of layers expanded and the number of cells expanded.
+        """
+        import numpy as np
+
+        # Surround the grid with walls so neighbors never leave it
+        width = self.width + 2
+        blocked = np.ones((self.height + 2, width), dtype=bool)
+        blocked[1:-1, 1:-1] = np.frombuffer(
+            self.grid, dtype=np.uint8
+        ).reshape(self.height, self.width)
+        blocked = blocked.ravel()
+        distances = np.full(blocked.size, -1, dtype=np.int32)
+        offsets = np.array([-width, width, -1, 1])
+
+        source = (source[0] + 1) * width + source[1] + 1
+        target = -1 if target is None else (target[0] + 1) * width + target[1] + 1
+        distances[source] = 0
+        frontier = np.array([source])
+        step = 0
+        expanded = 0
+        while frontier.size and (target < 0 or distances[target] < 0):
+            step += 1
+            expanded += frontier.size
+            candidates = (frontier[:, None] + offsets).ravel()
+            candidates = candidates[~blocked[candidates]
+                                    & (distances[candidates] < 0)]
+            frontier = np.unique(candidates)
+            distances[frontier] = step
+        return distances, width, step, expanded
+
+
+    def distance_field(self, source):
+        """
+        Returns a NumPy array of the BFS distance from source to every
+        cell, indexed by flat cell index, with -1 for unreachable cells.
+        """
+        distances, width, _, _ = self._wavefront(source)
+        distances = distances.reshape(self.height + 2, width)[1:-1, 1:-1]
+        return distances.ravel()
+
+
+    def _solve_wavefront(self):
+        """
+        Breadth-first search by NumPy wavefront, then a walk back from
+        the goal through the distances to recover the path.
+        """
+        distances, width, step, self.num_explored = self._wavefront(
+            self.start, self.goal
+        )
+        explored = (distances >= 0) & (distances < step)
+        explored = explored.reshape(self.height + 2, width)[1:-1, 1:-1]
+        self.explored = CellMask(explored.ravel(), self.width)
+
+        start = (self.start[0] + 1) * width + self.start[1] + 1
+        goal = (self.goal[0] + 1) * width + self.goal[1] + 1
+        if distances[goal] < 0:
+            raise Exception("no solution")
+
+        # Step back from the goal through cells one closer to the start
+        moves = [("up", -width), ("down", width), ("left", -1), ("right", 1)]
+        actions = []
+        cells = []
+        cell = goal
+        while cell != start:
+            for action, offset in moves:
+                if distances[cell - offset] == distances[cell] - 1:
+                    actions.append(action)
+                    cells.append(divmod(int(cell), width))
+                    cell -= offset
+                    break
+        actions.reverse()
+        self.solution = (actions, [(i - 1, j - 1) for i, j in reversed(cells)])
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=None, cell_border=2):
+        """
+        Writes the maze as an image, built as a NumPy array of cell colors
+        that is scaled up to cell_size pixels per cell in one step. Borders
+        are dropped when cells are too small for them, so a cell_size of 1
+        renders huge mazes at one pixel per cell. By default cells are
+        CELL_SIZE pixels, or smaller if the image would be more than
+        IMAGE_SIDE pixels across.
+        """
+        import numpy as np
+        from PIL import Image
+
+        if cell_size is None:
+            longest = max(self.height, self.width)
+            cell_size = max(1, min(CELL_SIZE, IMAGE_SIDE // longest))
+
+        # Color of each cell, in increasing order of precedence
+        colors = np.array([
+            (237, 240, 252),  # Empty cell
+            (212, 97, 85),    # Explored
+            (220, 235, 113),  # Solution
+            (0, 171, 28),     # Goal
+            (255, 0, 0),      # Start
+            (40, 40, 40)      # Walls
+        ], dtype=np.uint8)
+        cells = np.zeros(self.height * self.width, dtype=np.uint8)
+
+        if self.solution is not None:
+            if show_explored:
+                if isinstance(self.explored, CellMask):
+                    explored = self.explored.flags
+                else:
+                    explored = np.fromiter(
+                        (self.index(state) for state in self.explored),
+                        dtype=np.int64, count=len(self.explored)
+                    )
+                cells[explored] = 1
+            if show_solution:
+                cells[[self.index(state) for state in self.solution[1]]] = 2
+        cells[self.index(self.goal)] = 3
+        cells[self.index(self.start)] = 4
+        cells[np.frombuffer(self.grid, dtype=np.uint8).astype(bool)] = 5
+
+        # Scale each cell up to a square, blacking out the borders
+        pixels = colors[cells.reshape(self.height, self.width)]
+        pixels = pixels.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+        if cell_size > 2 * cell_border:
+            edge = np.ones(cell_size, dtype=bool)
+            edge[cell_border:cell_size - cell_border + 1] = False
+            pixels[np.tile(edge, self.height)] = 0
+            pixels[:, np.tile(edge, self.width)] = 0
+
+        Image.fromarray(pixels, "RGB").save(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a maze.")
+    parser.add_argument("maze", help="maze file")
+    parser.add_argument("algorithm", nargs="?", default="dfs",
+                        choices=Maze.ALGORITHMS)
+    parser.add_argument("--cell-size", type=int, default=None,
+                        help=f"pixels per cell in maze.png (default: "
+                             f"{CELL_SIZE}, less for mazes over "
+                             f"{IMAGE_SIDE // CELL_SIZE} cells across)")
+    args = parser.parse_args()
+    if args.cell_size is not None and args.cell_size < 1:
+        parser.error("--cell-size must be at least 1")
+
+    m = Maze(args.maze)
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(args.algorithm)
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True, cell_size=args.cell_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Answers many start/goal queries against one maze layout.
+
+The layout is read once. For each goal a breadth-first distance field is
+computed, giving the number of steps from every cell to that goal, and
+kept for later queries. Moves are reversible, so a field answers queries
+to or from its cell: any query with either end already known is a lookup,
+and its path is recovered by stepping downhill through the field. Fields
+are kept least recently used first within a memory budget. Small mazes
+may instead precompute the field of every open cell, so that any pair at
+all is answered without a search.
+
+Queries are read from a file with one "row col row col" line per query,
+start first, separated by spaces or commas. Blank lines and lines starting
+with "#" are skipped. One JSON object per query is written to standard
+output and throughput is reported on stderr.
+
+Usage: python service.py maze.txt queries.txt [--goal-field] [--all-pairs]
+                         [--paths] [--cache-mb MB]
+"""
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+
+from maze import Maze
+
+# Mazes with at most this many open cells may precompute all pairs
+ALL_PAIRS_LIMIT = 2500
+
+# Mazes with more cells than this build distance fields with NumPy
+NUMPY_CELLS = 1 << 16
+
+# Default memory budget for kept distance fields, in bytes
+CACHE_BYTES = 256 << 20
+
+MOVES = (("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1))
+
+
+class MazeService():
+
+    def __init__(self, maze, goal_field=False, all_pairs=False,
+                 cache_bytes=CACHE_BYTES):
+        """
+        Loads a maze, given as a Maze or a file name. With goal_field, the
+        distance field of the maze's own goal is built up front, and with
+        all_pairs the field of every open cell is. Kept fields take at
+        most cache_bytes, but always at least one field.
+        """
+        if not isinstance(maze, Maze):
+            maze = Maze(maze)
+        self.maze = maze
+        self.height = maze.height
+        self.width = maze.width
+        self.grid = maze.grid
+
+        # Distance fields by flat goal index, -1 marking unreachable cells,
+        # least recently used first
+        self.fields = OrderedDict()
+        self.field_bytes = len(self.grid) * array("i").itemsize
+        self.max_fields = max(1, cache_bytes // self.field_bytes)
+        self.num_searches = 0
+        self.num_evictions = 0
+
+        if all_pairs:
+            self.precompute_all()
+        elif goal_field:
+            self.field(maze.goal)
+
+
+    def index(self, state):
+        """
+        Returns the flat index of an open cell, raising ValueError for
+        cells outside the maze or inside a wall.
+        """
+        row, col = state
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise ValueError(f"cell {state} is outside the maze")
+        i = row * self.width + col
+        if self.grid[i]:
+            raise ValueError(f"cell {state} is a wall")
+        return i
+
+
+    def field(self, goal):
+        """
+        Returns the distance field of goal as an array indexed by flat
+        cell index, building and keeping it if it is not known yet.
+        """
+        i = self.index(goal)
+        distances = self._cached(i)
+        if distances is None:
+            self.num_searches += 1
+            if self.height * self.width > NUMPY_CELLS:
+                distances = array("i", self.maze.distance_field(goal).tobytes())
+            else:
+                distances = self._bfs(i)
+            self._keep(i, distances)
+        return distances
+
+
+    def _cached(self, i):
+        """Returns the kept field of flat index i, or None."""
+        distances = self.fields.get(i)
+        if distances is not None:
+            self.fields.move_to_end(i)
+        return distances
+
+
+    def _keep(self, i, distances):
+        """Keeps a field, dropping the least recently used ones over budget."""
+        self.fields[i] = distances
+        while len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+            self.num_evictions += 1
+
+
+    def _bfs(self, source):
+        """Returns the distance field of a flat index by breadth-first search."""
+        grid = self.grid
+        width = self.width
+        size = len(grid)
+        distances = array("i", [-1]) * size
+        distances[source] = 0
+        frontier = deque([source])
+        while frontier:
+            i = frontier.popleft()
+            d = distances[i] + 1
+            col = i % width
+            for j in (i - width, i + width,
+                      i - 1 if col > 0 else -1,
+                      i + 1 if col < width - 1 else -1):
+                if 0 <= j < size and not grid[j] and distances[j] < 0:
+                    distances[j] = d
+                    frontier.append(j)
+        return distances
+
+
+    def precompute_all(self):
+        """
+        Builds the distance field of every open cell. Raises ValueError if
+        the maze has more than ALL_PAIRS_LIMIT open cells, or if their
+        fields do not fit in the memory budget.
+        """
+        cells = [i for i in range(len(self.grid)) if not self.grid[i]]
+        if len(cells) > ALL_PAIRS_LIMIT:
+            raise ValueError(
+                f"{len(cells)} open cells is too many for all pairs "
+                f"(limit {ALL_PAIRS_LIMIT})"
+            )
+        if len(cells) > self.max_fields:
+            raise ValueError(
+                f"all pairs needs {len(cells) * self.field_bytes / 2**20:.1f} "
+                f"MB of fields (budget "
+                f"{self.max_fields * self.field_bytes / 2**20:.1f} MB)"
+            )
+        for i in cells:
+            if i not in self.fields:
+                self.num_searches += 1
+                self._keep(i, self._bfs(i))
+
+
+    def distance(self, start, goal):
+        """
+        Returns the number of steps on a shortest path from start to goal,
+        or None if goal cannot be reached.
+        """
+        i, j = self.index(start), self.index(goal)
+        if j not in self.fields and i in self.fields:
+            d = self._cached(i)[j]
+        else:
+            d = self.field(goal)[i]
+        return None if d < 0 else d
+
+
+    def path(self, start, goal):
+        """
+        Returns (actions, cells) for a shortest path from start to goal in
+        the same form as Maze.solution, or None if goal cannot be reached.
+        With only the field of start known, the path is walked from goal
+        to start and reversed.
+        """
+        i, j = self.index(start), self.index(goal)
+        if j not in self.fields and i in self.fields:
+            distances = self._cached(i)
+            if distances[j] < 0:
+                return None
+            walk = self._downhill(distances, j)[::-1]
+        else:
+            distances = self.field(goal)
+            if distances[i] < 0:
+                return None
+            walk = self._downhill(distances, i)
+
+        width = self.width
+        actions = []
+        for a, b in zip(walk, walk[1:]):
+            for action, dr, dc in MOVES:
+                if b - a == dr * width + dc:
+                    actions.append(action)
+                    break
+        return actions, [divmod(b, width) for b in walk[1:]]
+
+
+    def _downhill(self, distances, i):
+        """
+        Returns the flat indices of a shortest path from i to the cell of
+        distances, both included, stepping to a cell one nearer each time.
+        """
+        width = self.width
+        row, col = divmod(i, width)
+        walk = [i]
+        while distances[i] > 0:
+            for _, dr, dc in MOVES:
+                r, c = row + dr, col + dc
+                if (0 <= r < self.height and 0 <= c < width
+                        and distances[r * width + c] == distances[i] - 1):
+                    break
+            row, col, i = r, c, r * width + c
+            walk.append(i)
+        return walk
+
+
+def read_queries(filename):
+    """Returns a list of ((row, col), (row, col)) queries from a file."""
+    queries = []
+    with open(filename) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            values = line.replace(",", " ").split()
+            if len(values) != 4:
+                raise ValueError(f"line {number}: expected four numbers")
+            r1, c1, r2, c2 = map(int, values)
+            queries.append(((r1, c1), (r2, c2)))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer start/goal queries against one maze."
+    )
+    parser.add_argument("maze", help="maze file")
+    parser.add_argument("queries", help="file of 'row col row col' lines")
+    parser.add_argument("--goal-field", action="store_true",
+                        help="precompute the field of the maze's goal")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help=f"precompute every field (at most "
+                             f"{ALL_PAIRS_LIMIT} open cells)")
+    parser.add_argument("--paths", action="store_true",
+                        help="include the cells of each path")
+    parser.add_argument("--cache-mb", type=int, default=CACHE_BYTES >> 20,
+                        help=f"memory for kept fields (default: "
+                             f"{CACHE_BYTES >> 20})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = MazeService(args.maze, args.goal_field, args.all_pairs,
+                          args.cache_mb << 20)
+    queries = read_queries(args.queries)
+    print(f"Loaded in {time.perf_counter() - start:.3f}s.", file=sys.stderr)
+
+    results = []
+    start = time.perf_counter()
+    for a, b in queries:
+        try:
+            if args.paths:
+                solution = service.path(a, b)
+                distance = None if solution is None else len(solution[0])
+            else:
+                distance = service.distance(a, b)
+            result = {"start": a, "goal": b, "distance": distance}
+            if args.paths:
+                result["path"] = None if solution is None else solution[1]
+        except ValueError as e:
+            result = {"start": a, "goal": b, "error": str(e)}
+        results.append(result)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        print(json.dumps(result))
+    each = elapsed / len(queries) * 1e6 if queries else 0
+    print(f"{len(queries)} queries, {service.num_searches} searches, "
+          f"{service.num_evictions} evictions, in {elapsed:.3f}s "
+          f"({each:.1f} µs/query).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,13 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def expression(self, index):
+        """
+        Returns Python source for the value of the logical sentence in a
+        list v of symbol values, where index maps symbol names to positions.
+        """
+        raise Exception("nothing to compile")
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
         return set()
@@ -65,6 +72,12 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
+    def expression(self, index):
+        try:
+            return f"v[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in index")
+
     def symbols(self):
         return {self.name}
 
@@ -89,6 +102,9 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
     def symbols(self):
         return self.operand.symbols()
 
@@ -126,6 +142,13 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts
+        ) + ")"
+
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
@@ -157,6 +180,13 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts
+        ) + ")"
+
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
@@ -188,6 +218,11 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
@@ -211,53 +246,592 @@ class Biconditional(Sentence):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"({left} == {right})"
+
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+class Solver():
+    """
+    SAT solver over sentences converted to conjunctive normal form.
+
+    Each symbol is numbered as a variable from 1, and a literal is a
+    variable or its negation. Sentences are converted with the Tseitin
+    encoding: every compound subsentence gets a variable of its own, with
+    clauses stating that it is true exactly when the subsentence is, so
+    the clauses grow linearly with the sentence instead of exponentially.
+
+    solve runs DPLL search with unit propagation over two watched literals
+    per clause, and conflict-driven clause learning with non-chronological
+    backjumping. Learned clauses follow from the added sentences alone, so
+    they are kept across calls to solve.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.names = [None]
+        self.definitions = {}
+        self.clauses = []
+        self.watches = {}
+        self.ok = True
+
+        # Assignment, indexed by variable: None, True or False
+        self.assignment = [None]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.increment = 1.0
+
+        # Number of conflicts and decisions made by all searches
+        self.conflicts = 0
+        self.decisions = 0
+
+    def new_variable(self, name=None):
+        """Returns a new variable, for a symbol name or a subsentence."""
+        self.names.append(name)
+        self.assignment.append(None)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        self.watches[len(self.names) - 1] = []
+        self.watches[-(len(self.names) - 1)] = []
+        return len(self.names) - 1
+
+    def variable(self, name):
+        """Returns the variable of a symbol name."""
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.variables[name] = self.new_variable(name)
+        return variable
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is, adding
+        the Tseitin clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+
+        key = repr(sentence)
+        literal = self.definitions.get(key)
+        if literal is not None:
+            return literal
+
+        if isinstance(sentence, Implication):
+            literal = self._define_or([-self.literal(sentence.antecedent),
+                                       self.literal(sentence.consequent)])
+        elif isinstance(sentence, Or):
+            literal = self._define_or(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, And):
+            literal = -self._define_or(
+                [-self.literal(conjunct) for conjunct in sentence.conjuncts]
+            )
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.new_variable()
+            self.add_clause([-literal, -left, right])
+            self.add_clause([-literal, left, -right])
+            self.add_clause([literal, left, right])
+            self.add_clause([literal, -left, -right])
+        else:
+            raise TypeError("must be a logical sentence")
+        self.definitions[key] = literal
+        return literal
+
+    def _define_or(self, literals):
+        """Returns a new literal that is true exactly when one of literals is."""
+        literal = self.new_variable()
+        self.add_clause([-literal] + literals)
+        for other in literals:
+            self.add_clause([literal, -other])
+        return literal
+
+    def add(self, sentence):
+        """
+        Asserts that sentence is true. Conjunctions and disjunctions at
+        the top are added as clauses directly, without new variables.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.add_clause([self.literal(disjunct)
+                             for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.add_clause([-self.literal(sentence.antecedent),
+                             self.literal(sentence.consequent)])
+        else:
+            self.add_clause([self.literal(sentence)])
+
+    def add_clause(self, literals):
+        """Adds a clause, a list of literals of which one must be true."""
+        self._cancel(0)
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                return
+            if literal not in clause:
+                clause.append(literal)
+
+        # Drop literals already false, and clauses already true
+        if any(self._value(literal) is True for literal in clause):
+            return
+        clause = [literal for literal in clause
+                  if self._value(literal) is None]
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            if self._propagate() is not None:
+                self.ok = False
+        else:
+            self._watch(clause)
+
+    def _watch(self, clause):
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def _value(self, literal):
+        value = self.assignment[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def _assign(self, literal, reason):
+        variable = abs(literal)
+        self.assignment[variable] = literal > 0
+        self.level[variable] = len(self.trail_limits)
+        self.reason[variable] = reason
+        self.trail.append(literal)
+
+    def _cancel(self, level):
+        """Undoes every assignment made above a decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.assignment[variable] = None
+            self.reason[variable] = None
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def _propagate(self):
+        """
+        Assigns every literal forced by a clause with all but one literal
+        false. Returns a clause with all its literals false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false]
+            kept = []
+            conflict = None
+            for i, clause in enumerate(watching):
+                if conflict is not None:
+                    kept.append(clause)
+                    continue
+
+                # Keep the false literal in the second watched position
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if self._value(clause[0]) is True:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for k in range(2, len(clause)):
+                    if self._value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self._value(clause[0]) is False:
+                        conflict = clause
+                    else:
+                        self._assign(clause[0], clause)
+            self.watches[false] = kept
+            if conflict is not None:
+                self.head = len(self.trail)
+                return conflict
+        return None
+
+    def _analyze(self, conflict):
+        """
+        Returns (clause, level) for the clause learned from a conflict, cut
+        at the first unique implication point, and the level to jump back
+        to. The clause's first literal is the one it will assert.
+        """
+        level = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        count = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable in seen or self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self._bump(variable)
+                if self.level[variable] == level:
+                    count += 1
+                else:
+                    learned.append(other)
+
+            # Resolve on the latest assigned literal of this level
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(literal)]
+            count -= 1
+            if count == 0:
+                break
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        highest = max(range(1, len(learned)),
+                      key=lambda i: self.level[abs(learned[i])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def _bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+
+    def _decide(self):
+        """Returns the unassigned variable with the most activity, or None."""
+        best = None
+        for variable in range(1, len(self.names)):
+            if self.assignment[variable] is None and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses can all be true with every literal of
+        assumptions true, False otherwise. After True, model maps each
+        symbol name to its value in a satisfying assignment.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self._cancel(0)
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learned, level = self._analyze(conflict)
+                self._cancel(level)
+                if len(learned) == 1:
+                    self._assign(learned[0], None)
+                else:
+                    self._watch(learned)
+                    self._assign(learned[0], learned)
+                self.increment *= 1.05
+                continue
+
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self._value(literal)
+                if value is False:
+                    self._cancel(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self._assign(literal, None)
+                continue
+
+            variable = self._decide()
+            if variable is None:
+                self.model = {name: self.assignment[variable]
+                              for name, variable in self.variables.items()}
+                self._cancel(0)
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self._assign(variable if self.phase[variable] else -variable, None)
+
+    def entails(self, query):
+        """Returns True if the sentences added so far entail query."""
+        return not self.solve([-self.literal(query)])
+
+
+# Answers of KnowledgeBase.ask
+ENTAILED = "entailed"
+REFUTED = "refuted"
+UNKNOWN = "unknown"
+
+
+class KnowledgeBase(And):
+    """
+    Conjunction of sentences that answers queries incrementally.
+
+    Sentences are fed to one Solver as they are added, so its clauses and
+    learned clauses carry over from query to query. Every satisfying model
+    the solver finds is kept as a witness: a query false in a witness is
+    not entailed, and one true in a witness is not refuted, which settles
+    most unknown queries without searching. Adding a sentence only drops
+    the witnesses it makes false and the answers that were unknown, since
+    entailed and refuted answers stay true as knowledge grows (unless the
+    knowledge may have become inconsistent, when refuted ones are dropped
+    too).
+    """
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def __init__(self, *conjuncts):
+        super().__init__(*conjuncts)
+        self.solver = None
+        self.witnesses = []
+        self.answers = {}
 
-        # If model has an assignment for each symbol
-        if not symbols:
+        # Number of queries, answers reused, and searches run by the solver
+        self.queries = 0
+        self.hits = 0
+        self.searches = 0
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def add(self, conjunct):
+        super().add(conjunct)
+        if self.solver is not None:
+            self.solver.add(conjunct)
+            names = conjunct.symbols()
+            self.witnesses = [
+                model for model in self.witnesses
+                if names <= model.keys() and conjunct.evaluate(model)
+            ]
+
+        # A surviving witness shows the knowledge is still consistent, so
+        # refuted queries cannot have become entailed
+        keep = (ENTAILED, REFUTED) if self.witnesses else (ENTAILED,)
+        self.answers = {key: answer for key, answer in self.answers.items()
+                        if answer in keep}
+
+    def consistent(self):
+        """Returns True if some model makes every sentence true."""
+        return self._satisfiable([])
+
+    def entails(self, query):
+        """Returns True if the knowledge base entails query."""
+        return self.ask(query) == ENTAILED
+
+    def ask(self, query):
+        """
+        Returns ENTAILED if the knowledge base entails query, REFUTED if it
+        entails the negation of query, and UNKNOWN otherwise. An
+        inconsistent knowledge base entails every query.
+        """
+        self.queries += 1
+        key = repr(query)
+        answer = self.answers.get(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+
+        names = query.symbols()
+        can_be_true = can_be_false = False
+        for model in self.witnesses:
+            if names <= model.keys():
+                if query.evaluate(model):
+                    can_be_true = True
+                else:
+                    can_be_false = True
+
+        if not can_be_false:
+            can_be_false = self._satisfiable([-self._literal(query)])
+        if not can_be_false:
+            answer = ENTAILED
+        else:
+            if not can_be_true:
+                can_be_true = self._satisfiable([self._literal(query)])
+            answer = UNKNOWN if can_be_true else REFUTED
+        self.answers[key] = answer
+        return answer
+
+    def ask_all(self, queries):
+        """Returns a list of the answers to each of queries."""
+        return [self.ask(query) for query in queries]
+
+    def _literal(self, query):
+        if self.solver is None:
+            self._start()
+        return self.solver.literal(query)
+
+    def _start(self):
+        self.solver = Solver()
+        for conjunct in self.conjuncts:
+            self.solver.add(conjunct)
+
+    def _satisfiable(self, assumptions):
+        if self.solver is None:
+            self._start()
+        self.searches += 1
+        if not self.solver.solve(assumptions):
+            return False
+        self.witnesses.append(self.solver.model)
+        return True
+
+
+# Ways model_check can decide entailment
+METHODS = ("sat", "enumerate", "bitset")
+
+# Most symbols bitset checks allow, as its vectors take 2^n bits each
+MAX_BITSET_SYMBOLS = 25
+
+# Bits of a 64-bit word set where symbol i, for i < 6, is true in the
+# models numbered by the bit positions
+WORD_PATTERNS = [sum(1 << j for j in range(64) if j >> i & 1)
+                 for i in range(6)]
+
+
+def model_check(knowledge, query, method="sat"):
+    """
+    Checks if knowledge base entails query, by a SAT solver refuting
+    knowledge and not query, by enumerating every model, or by evaluating
+    every model at once as bit-vectors.
+    """
+    if method == "sat":
+        solver = Solver()
+        solver.add(knowledge)
+        return solver.entails(query)
+    if method == "enumerate":
+        return enumerate_check(knowledge, query)
+    if method == "bitset":
+        return bitset_check(knowledge, [query])[0]
+    raise ValueError(f"unknown method {method}")
+
+
+def model_check_all(knowledge, queries, method="bitset"):
+    """
+    Returns a list of whether knowledge base entails each of queries. The
+    bitset method evaluates knowledge once for all of them.
+    """
+    if method == "bitset":
+        return bitset_check(knowledge, queries)
+    return [model_check(knowledge, query, method) for query in queries]
+
+
+def bitset_check(knowledge, queries):
+    """
+    Returns a list of whether knowledge base entails each of queries, by
+    evaluating every sentence in all 2^n models at once.
+
+    Model m assigns symbol i the value of bit i of m. Each sentence is a
+    NumPy vector of 64-bit words whose bit m is its value in model m, so
+    connectives are bitwise operations on whole vectors. Knowledge entails
+    a query if no model has knowledge true and the query false.
+    """
+    import numpy as np
+
+    symbols = sorted(set.union(knowledge.symbols(),
+                               *[query.symbols() for query in queries]))
+    n = len(symbols)
+    if n > MAX_BITSET_SYMBOLS:
+        raise ValueError(f"{n} symbols is too many for bitset checks "
+                         f"(limit {MAX_BITSET_SYMBOLS})")
+
+    # With fewer than 64 models, only the low bits of one word are used
+    words = np.arange(max(1, 2 ** n // 64), dtype=np.uint64)
+    ones = np.full(len(words), ~np.uint64(0))
+    valid = ones if n >= 6 else np.full(1, np.uint64(2 ** 2 ** n - 1))
+    vectors = {}
+    for i, symbol in enumerate(symbols):
+        if i < 6:
+            vectors[symbol] = np.full(len(words), np.uint64(WORD_PATTERNS[i]))
+        else:
+            vectors[symbol] = -((words >> np.uint64(i - 6)) & np.uint64(1))
+
+    cache = {}
+
+    def bits(sentence):
+        """Returns the bit-vector of a sentence, shared by repeated parts."""
+        if isinstance(sentence, Symbol):
+            return vectors[sentence.name]
+        key = repr(sentence)
+        if key in cache:
+            return cache[key]
+        if isinstance(sentence, Not):
+            result = ~bits(sentence.operand)
+        elif isinstance(sentence, And):
+            result = ones
+            for conjunct in sentence.conjuncts:
+                result = result & bits(conjunct)
+        elif isinstance(sentence, Or):
+            result = ~ones
+            for disjunct in sentence.disjuncts:
+                result = result | bits(disjunct)
+        elif isinstance(sentence, Implication):
+            result = ~bits(sentence.antecedent) | bits(sentence.consequent)
+        elif isinstance(sentence, Biconditional):
+            result = ~(bits(sentence.left) ^ bits(sentence.right))
         else:
+            raise TypeError("must be a logical sentence")
+        cache[key] = result
+        return result
+
+    known = bits(knowledge) & valid
+    return [not (known & ~bits(query)).any() for query in queries]
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+def compile_sentence(sentence, index):
+    """
+    Returns a function of a list or tuple v of symbol values, where index
+    maps each symbol name to its position in v, that evaluates sentence
+    in one call, without walking the sentence or looking up names.
+    """
+    return eval(f"lambda v: {sentence.expression(index)}")
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def enumerate_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by evaluating a compiled
+    knowledge and not query in every model.
+    """
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    # Get all symbols in both knowledge and query, numbered in order
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Models are tuples of symbol values, in the order of symbols
+    counterexample = compile_sentence(And(knowledge, Not(query)), index)
+    models = itertools.product((False, True), repeat=len(symbols))
+    return not any(map(counterexample, models))
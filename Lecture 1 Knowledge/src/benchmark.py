@@ -0,0 +1,166 @@
+"""
+Times the model_check methods of logic.py on the clue, mastermind and
+knights knowledge bases.
+
+Each symbol of a knowledge base is checked for being entailed and for
+being refuted, as clue.py's check_knowledge does, and every method must
+give the same answers as the first one run. With the bitset method, all
+the queries are also answered together by model_check_all.
+
+Evaluations per second of each knowledge base in random models are also
+compared between Sentence.evaluate on a dict model and the compiled
+function on a tuple of values.
+
+Finally, the sentences of each knowledge base are added one at a time,
+asking about every symbol after each one, as new Clue cards would arrive:
+once with fresh sat checks of the whole knowledge each time, and once
+with a KnowledgeBase that keeps its solver and answers between additions.
+
+Usage: python benchmark.py [--methods METHOD ...] [--models N]
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import time
+
+import clue
+import mastermind
+from logic import (ENTAILED, METHODS, REFUTED, UNKNOWN, And, KnowledgeBase,
+                   Not, compile_sentence, model_check, model_check_all)
+
+KNIGHTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       "..", "PROJECTS", "knights", "puzzle.py")
+
+
+def problems():
+    """Returns (name, knowledge, symbols) for every knowledge base."""
+    spec = importlib.util.spec_from_file_location("knights", KNIGHTS)
+    knights = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(knights)
+    people = [knights.AKnight, knights.AKnave, knights.BKnight,
+              knights.BKnave, knights.CKnight, knights.CKnave]
+
+    return [
+        ("clue", clue.knowledge, clue.symbols),
+        ("mastermind", mastermind.knowledge, mastermind.symbols)
+    ] + [
+        (f"knights {i}", getattr(knights, f"knowledge{i}"), people)
+        for i in range(4)
+    ]
+
+
+def evaluation_rates(knowledge, count, seed=0):
+    """
+    Returns evaluations per second of knowledge in count random models,
+    walking the sentence and with the compiled function.
+    """
+    rng = random.Random(seed)
+    symbols = sorted(knowledge.symbols())
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    models = [tuple(rng.random() < 0.5 for _ in symbols) for _ in range(count)]
+    dicts = [dict(zip(symbols, model)) for model in models]
+
+    start = time.perf_counter()
+    walked = [knowledge.evaluate(model) for model in dicts]
+    before = count / (time.perf_counter() - start)
+
+    function = compile_sentence(knowledge, index)
+    start = time.perf_counter()
+    compiled = [function(model) for model in models]
+    after = count / (time.perf_counter() - start)
+
+    if walked != compiled:
+        raise Exception("compiled sentence disagrees with evaluate")
+    return before, after
+
+
+def replay(conjuncts, symbols):
+    """
+    Returns (fresh seconds, incremental seconds, searches) for asking about
+    every symbol after each conjunct is added, and checks both agree.
+    """
+    start = time.perf_counter()
+    fresh = []
+    for i in range(1, len(conjuncts) + 1):
+        knowledge = And(*conjuncts[:i])
+        for symbol in symbols:
+            if model_check(knowledge, symbol):
+                fresh.append(ENTAILED)
+            elif model_check(knowledge, Not(symbol)):
+                fresh.append(REFUTED)
+            else:
+                fresh.append(UNKNOWN)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    incremental = []
+    knowledge = KnowledgeBase()
+    for conjunct in conjuncts:
+        knowledge.add(conjunct)
+        incremental.extend(knowledge.ask_all(symbols))
+    after = time.perf_counter() - start
+
+    if fresh != incremental:
+        raise Exception("KnowledgeBase disagrees with model_check")
+    return before, after, knowledge.searches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time model_check methods on example knowledge bases."
+    )
+    parser.add_argument("--methods", nargs="+", choices=METHODS,
+                        default=list(METHODS))
+    parser.add_argument("--models", type=int, default=20000,
+                        help="random models per evaluation rate")
+    args = parser.parse_args()
+
+    print(f"{'problem':<14}{'method':<12}{'queries':>8}{'seconds':>10}"
+          f"{'ms/query':>10}")
+    for name, knowledge, symbols in problems():
+        queries = [query for symbol in symbols
+                   for query in (symbol, Not(symbol))]
+        expected = None
+        for method in args.methods:
+            start = time.perf_counter()
+            answers = [model_check(knowledge, query, method)
+                       for query in queries]
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = answers
+            elif answers != expected:
+                raise Exception(f"{method} disagrees on {name}")
+            print(f"{name:<14}{method:<12}{len(queries):>8}{elapsed:>10.3f}"
+                  f"{elapsed / len(queries) * 1000:>10.3f}")
+
+        # All queries from one bit-vector evaluation of the knowledge
+        if "bitset" in args.methods:
+            start = time.perf_counter()
+            answers = model_check_all(knowledge, queries)
+            elapsed = time.perf_counter() - start
+            if answers != expected:
+                raise Exception(f"model_check_all disagrees on {name}")
+            print(f"{name:<14}{'bitset all':<12}{len(queries):>8}"
+                  f"{elapsed:>10.3f}{elapsed / len(queries) * 1000:>10.3f}")
+
+    print()
+    print(f"{'problem':<14}{'evaluate/s':>14}{'compiled/s':>14}{'speedup':>10}")
+    for name, knowledge, _ in problems():
+        before, after = evaluation_rates(knowledge, args.models)
+        print(f"{name:<14}{before:>14.0f}{after:>14.0f}"
+              f"{after / before:>9.1f}x")
+
+    print()
+    print(f"{'problem':<14}{'additions':>10}{'fresh s':>10}"
+          f"{'incremental s':>15}{'searches':>10}")
+    for name, knowledge, symbols in problems():
+        conjuncts = list(knowledge.conjuncts)
+        before, after, searches = replay(conjuncts, symbols)
+        print(f"{name:<14}{len(conjuncts):>10}{before:>10.3f}"
+              f"{after:>15.3f}{searches:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ for i in range(4):
     for color in colors:
         symbols.append(Symbol(f"{color}{i}"))
 
-knowledge = And()
+knowledge = KnowledgeBase()
 
 # Each color has a position.
 for color in colors:
@@ -51,6 +51,7 @@ knowledge.add(And(
     Not(Symbol("yellow3"))
 ))
 
-for symbol in symbols:
-    if model_check(knowledge, symbol):
-        print(symbol)
+if __name__ == "__main__":
+    for symbol in symbols:
+        if knowledge.entails(symbol):
+            print(symbol)